@@ -0,0 +1,30 @@
+# audio/quantize_wake_word.py
+"""
+Make an INT8 copy of a wake word ONNX model (heyr2.onnx -> heyr2.int8.onnx).
+WakeWordDetector users pick the .int8.onnx file up automatically through prefer_quantized().
+
+Check recall / false accepts with the quantized model before relying on it - if the
+0.7 threshold no longer triggers reliably, delete the .int8.onnx file to go back to FP32.
+"""
+import argparse
+import os
+
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from wake_word import quantized_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize a wake word ONNX model to INT8")
+    parser.add_argument('model', nargs='?', default="audio/wakeword_models/heyr2.onnx",
+                        help='FP32 ONNX model (default: audio/wakeword_models/heyr2.onnx)')
+    args = parser.parse_args()
+
+    output_path = quantized_path(args.model)
+    # Dynamic quantization: INT8 weights, activations quantized on the fly - no calibration set needed
+    quantize_dynamic(args.model, output_path, weight_type=QuantType.QInt8, per_channel=True)
+
+    size_before = os.path.getsize(args.model) / 1024
+    size_after = os.path.getsize(output_path) / 1024
+    print(f"Wrote {output_path} ({size_before:.0f} KB -> {size_after:.0f} KB)")
+
+if __name__ == "__main__":
+    main()
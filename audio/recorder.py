@@ -2,77 +2,209 @@
 import pyaudio
 import wave
 import io
+import threading
 from typing import Optional
+import numpy as np
 import pygame
 import random
 import os
 
+def pcm_to_wav(pcm: np.ndarray, sample_rate: int = 16000) -> bytes:
+    """Wrap mono int16 PCM samples in an in-memory WAV container"""
+    wav_buffer = io.BytesIO()
+    with wave.open(wav_buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)  # int16
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm)
+    return wav_buffer.getvalue()
+
+
+class RingBuffer:
+    """
+    Single-producer / single-consumer int16 ring buffer.
+    The PortAudio callback writes, the audio loop reads. Positions are absolute
+    sample counts, so the reader can tell how far behind the writer it is.
+    """
+    def __init__(self, capacity: int):
+        self._data = np.empty(capacity, dtype=np.int16)
+        self.capacity = capacity
+        self.head = 0  # total samples written
+        self.tail = 0  # next sample for read()
+        self._data_ready = threading.Event()
+        self._closed = False  # Set by close() to release a blocked reader
+
+    def write(self, samples: np.ndarray):
+        """Copy samples in, overwriting the oldest data once full (producer side)"""
+        start = self.head % self.capacity
+        end = start + samples.size
+
+        if end <= self.capacity:
+            self._data[start:end] = samples
+        else:
+            split = self.capacity - start
+            self._data[start:] = samples[:split]
+            self._data[:end - self.capacity] = samples[split:]
+
+        self.head += samples.size
+        self._data_ready.set()
+
+    def wait_for(self, position: int, timeout: Optional[float] = None) -> bool:
+        """Block until the writer reaches the given position. Returns False on timeout or close()."""
+        while self.head < position:
+            if self._closed:
+                return False
+            self._data_ready.clear()
+            if self.head >= position or self._closed:
+                continue
+            if not self._data_ready.wait(timeout):
+                return False
+        return True
+
+    def read(self, num_samples: int) -> np.ndarray:
+        """Consume the next num_samples, skipping ahead if the writer has lapped the reader"""
+        if not self.wait_for(self.tail + num_samples):
+            return np.zeros(num_samples, dtype=np.int16)  # Closed - hand back silence
+
+        oldest = self.head - self.capacity
+        if self.tail < oldest:
+            self.tail = oldest
+
+        samples = self.slice(self.tail, num_samples)
+        self.tail += num_samples
+        return samples
+
+    def slice(self, start: int, num_samples: int, copy: bool = True) -> np.ndarray:
+        """
+        Samples at an absolute position. With copy=False a view into the ring
+        is returned when the range doesn't wrap (valid until overwritten).
+        """
+        begin = start % self.capacity
+        end = begin + num_samples
+        if end <= self.capacity:
+            view = self._data[begin:end]
+            return view.copy() if copy else view
+        return np.concatenate((self._data[begin:], self._data[:end - self.capacity]))
+
+    def clear(self):
+        """Drop everything not yet read - O(1)"""
+        self.tail = self.head
+
+    def close(self):
+        """Wake a reader blocked in read()/wait_for() and make further waits return immediately"""
+        self._closed = True
+        self._data_ready.set()
+
+    def reset(self):
+        self._closed = False
+        self.head = 0
+        self.tail = 0
+
+
 class AudioRecorder:
-    def __init__(self, sample_rate: int = 16000, chunk_size: int = 1024):
+    def __init__(self, sample_rate: int = 16000, chunk_size: int = 1024, max_seconds: float = 5.0):
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
         self.audio = pyaudio.PyAudio()
         self.stream: Optional[pyaudio.Stream] = None
-        
+
+        # Filled by the PortAudio callback; holds at least 1s so the reader can fall behind briefly
+        self._ring = RingBuffer(max(sample_rate, int(sample_rate * max_seconds)))
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        """PortAudio callback - only copies the new samples into the ring buffer"""
+        self._ring.write(np.frombuffer(in_data, dtype=np.int16))
+        return (None, pyaudio.paContinue)
+
     def start_listening(self):
         """Start the audio input stream"""
+        self._ring.reset()
         self.stream = self.audio.open(
             format=pyaudio.paInt16,
             channels=1,
             rate=self.sample_rate,
             input=True,
-            frames_per_buffer=self.chunk_size
+            frames_per_buffer=self.chunk_size,
+            stream_callback=self._callback
         )
     
     def read_chunk(self) -> bytes:
         """Read a single audio chunk"""
+        return self.read_chunk_pcm().tobytes()
+
+    def read_chunk_pcm(self) -> np.ndarray:
+        """Read a single audio chunk as int16 samples"""
         if not self.stream:
             raise RuntimeError("Audio stream not started")
-        return self.stream.read(self.chunk_size)
+        return self._ring.read(self.chunk_size)
     
     def record_command(self, timeout_seconds: float = 3.0) -> bytes:
-        """Record audio for a fixed duration"""
+        """Record audio for a fixed duration, returned as WAV bytes"""
+        start = self._record(timeout_seconds)
+        # Samples go straight from the ring into the WAV buffer
+        pcm = self._ring.slice(start, int(self.sample_rate * timeout_seconds), copy=False)
+        return pcm_to_wav(pcm, self.sample_rate)
+
+    def record_command_pcm(self, timeout_seconds: float = 3.0) -> np.ndarray:
+        """Record audio for a fixed duration, returned as raw int16 samples"""
+        start = self._record(timeout_seconds)
+        return self._ring.slice(start, int(self.sample_rate * timeout_seconds))
+
+    def record_command_stream(self, timeout_seconds: float = 3.0, chunk_seconds: float = 0.25):
+        """
+        Record for a fixed duration like record_command_pcm(), but yield the int16 samples in
+        chunk_seconds pieces as they arrive so they can be processed during the recording
+        """
         if not self.stream:
             raise RuntimeError("Audio stream not started")
-            
-        frames = []
-        num_chunks = int(self.sample_rate / self.chunk_size * timeout_seconds)
-        
-        for _ in range(num_chunks):
-            data = self.stream.read(self.chunk_size)
-            frames.append(data)
-        
-        # Convert to WAV format in memory
-        wav_buffer = io.BytesIO()
-        with wave.open(wav_buffer, 'wb') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-            wav_file.setframerate(self.sample_rate)
-            wav_file.writeframes(b''.join(frames))
-        
-        wav_buffer.seek(0)
-        return wav_buffer.read()
+
+        num_samples = int(self.sample_rate * timeout_seconds)
+        chunk = int(self.sample_rate * chunk_seconds)
+        start = self._ring.head
+        end = start + num_samples
+        position = start
+        while position < end:
+            size = min(chunk, end - position)
+            if not self._ring.wait_for(position + size):
+                break  # Closed at shutdown
+            oldest = self._ring.head - self._ring.capacity
+            if position < oldest:
+                # Consumer fell a whole ring behind - skip what the writer already overwrote
+                position = oldest
+                if position >= end:
+                    break
+                size = min(chunk, end - position)
+            yield self._ring.slice(position, size)
+            position += size
+        self._ring.tail = max(self._ring.tail, position)
+
+    def _record(self, timeout_seconds: float) -> int:
+        """Wait until timeout_seconds of new audio is in the ring and return its start position"""
+        if not self.stream:
+            raise RuntimeError("Audio stream not started")
+
+        num_samples = int(self.sample_rate * timeout_seconds)
+        if num_samples > self._ring.capacity:
+            raise ValueError(f"Cannot record more than {self._ring.capacity / self.sample_rate:.1f}s")
+
+        # Let the callback fill the ring, then take the whole recording in one slice
+        start = self._ring.head
+        self._ring.wait_for(start + num_samples)
+        self._ring.tail = max(self._ring.tail, start + num_samples)
+        return start
     
     def clear_buffer(self):
         """Clear all pending audio data from the input buffer"""
         if not self.stream:
             return
         
-        # Read available data to clear buffer
-        try:
-            # Check how much data is available
-            available_frames = self.stream.get_read_available()
-            if available_frames > 0:
-                # Read all available frames
-                self.stream.read(available_frames, exception_on_overflow=False)
-        except Exception:
-            # Fallback: try to read a few chunks to clear buffer
-            try:
-                for _ in range(10):  # Read up to 10 chunks
-                    self.stream.read(self.chunk_size, exception_on_overflow=False)
-            except Exception:
-                pass
+        # Everything written so far counts as consumed
+        self._ring.clear()
     
+    def wake_from_read(self):
+        """Release a read_chunk()/record_command() blocked waiting for audio (used at shutdown)"""
+        self._ring.close()
+
     def stop_listening(self):
         """Stop and clean up audio stream"""
         if self.stream:
@@ -82,40 +214,54 @@ class AudioRecorder:
 
 
 class AudioSpeaker:
-    def __init__(self):
-        """Initialize pygame mixer for audio playback"""
+    def __init__(self, sounds_root: str = "audio/sounds"):
+        """Initialize pygame mixer for audio playback and index the sound files once"""
         pygame.mixer.init()
+
+        # emotion -> list of sound file paths, built once instead of listing the folder per call
+        self._sounds = {}
+        if os.path.isdir(sounds_root):
+            for emotion in os.listdir(sounds_root):
+                folder = os.path.join(sounds_root, emotion)
+                if os.path.isdir(folder):
+                    self._sounds[emotion] = [os.path.join(folder, f) for f in os.listdir(folder)
+                                             if f.lower().endswith(('.wav', '.mp3', '.ogg'))]
+        else:
+            print(f"Sound folder not found: {sounds_root}")
+
+        # file path -> decoded pygame Sound, filled on first play
+        self._loaded = {}
+    
+    def warmup(self):
+        """Decode every clip up front and open the output device with a short silent sound"""
+        for audio_files in self._sounds.values():
+            for file_path in audio_files:
+                if file_path not in self._loaded:
+                    self._loaded[file_path] = pygame.mixer.Sound(file_path)
+        pygame.mixer.Sound(buffer=b'\x00' * 2400).play()
     
     def speak(self, emotion: str):
         """Play a random R2-D2 sound file from the emotion category folder"""
-        sound_folder = f"audio/sounds/{emotion}"
-        
+        audio_files = self._sounds.get(emotion)
+        if not audio_files:
+            print(f"No audio files found for emotion: {emotion}")
+            return
+
         try:
-            # Get all audio files in the emotion folder
-            if not os.path.exists(sound_folder):
-                print(f"Sound folder not found: {sound_folder}")
-                return
-            
-            audio_files = [f for f in os.listdir(sound_folder) 
-                          if f.lower().endswith(('.wav', '.mp3', '.ogg'))]
-            
-            if not audio_files:
-                print(f"No audio files found in {sound_folder}")
-                return
-            
             # Pick random audio file
-            selected_file = random.choice(audio_files)
-            file_path = os.path.join(sound_folder, selected_file)
+            file_path = random.choice(audio_files)
             
-            # print(f"Playing R2-D2 sound: {selected_file}")
+            # print(f"Playing R2-D2 sound: {file_path}")
             
-            # Load and play the sound
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
+            # Decode once and keep the Sound around for the next time this clip is picked
+            sound = self._loaded.get(file_path)
+            if sound is None:
+                sound = pygame.mixer.Sound(file_path)
+                self._loaded[file_path] = sound
+            sound.play()
             
-            # Wait for sound to finish
-            while pygame.mixer.music.get_busy():
-                pygame.time.wait(100)
+            # Wait exactly the clip length instead of polling the mixer
+            pygame.time.wait(int(sound.get_length() * 1000))
                 
         except Exception as e:
             print(f"Error playing sound: {e}")
@@ -1,39 +1,169 @@
 # audio/wake_word.py
+import os
 import openwakeword
 from openwakeword import Model
 import numpy as np
+import onnxruntime as ort
+
+def quantized_path(model_path: str) -> str:
+    """heyr2.onnx -> heyr2.int8.onnx"""
+    root, ext = os.path.splitext(model_path)
+    return f"{root}.int8{ext}"
+
+def prefer_quantized(model_path: str) -> str:
+    """Use the INT8 copy made by audio/quantize_wake_word.py when it exists"""
+    int8_path = quantized_path(model_path)
+    return int8_path if os.path.exists(int8_path) else model_path
 
 class WakeWordDetector:
-    def __init__(self, wakeword_models: list = None, detection_threshold=0.7):
+    def __init__(self, wakeword_models: list = None, detection_threshold=0.7, chunk_size: int = 1024,
+                 batch_chunks: int = 4, num_threads: int = None):
+        """
+        Args:
+            batch_chunks: Number of audio chunks gathered before each model call.
+                          Higher = fewer inference calls, lower = faster reaction.
+            num_threads: ONNX Runtime threads per session. Defaults to $HEYR2_WAKE_THREADS, else 1 -
+                         these models are small enough that more threads only add sync overhead
+                         and take cores from tracking.
+        """
+        if num_threads is None:
+            num_threads = int(os.environ.get("HEYR2_WAKE_THREADS", "1"))
+        self.num_threads = num_threads
         if wakeword_models is None:
             wakeword_models = ['alexa']  # Default to alexa for testing
         
+        # Model() resolves pretrained names to file paths in this list, in place
+        model_paths = list(wakeword_models)
         self.model = Model(
-            wakeword_models=wakeword_models,
-            inference_framework='onnx'
+            wakeword_models=model_paths,
+            inference_framework='onnx',
+            ncpu=num_threads
             )
+        self._tune_onnx_sessions(model_paths)
         self.threshold = detection_threshold
+
+        # Hysteresis: after a trigger, scores must drop below release_threshold before the
+        # next trigger, so one long "Hey R2" spread across batches fires only once
+        self.release_threshold = detection_threshold * 0.5
+        self._armed = True
+        self.last_scores = {}  # Scores from the most recent model call
+
+        # Reused tile that collects batch_chunks chunks per model call. Kept as int16: openwakeword
+        # buffers raw PCM as int16 itself, so a float tile only adds a conversion per chunk
+        self.batch_chunks = batch_chunks
+        self._tile = np.empty(chunk_size * batch_chunks, dtype=np.int16)
+        self._fill = 0
         
-    def detect(self, audio_chunk: bytes) -> bool:
-        """Check if wake word is detected in audio chunk"""
-        # Convert bytes to numpy array
-        audio_array = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32)
-        
+    def _build_session(self, model_path: str) -> ort.InferenceSession:
+        """ONNX session with full graph optimization, num_threads threads, and XNNPACK when this onnxruntime has it"""
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = self.num_threads
+        options.inter_op_num_threads = 1  # unused in sequential mode
+        # Don't let idle worker threads busy-wait between chunks
+        options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+
+        providers = ["CPUExecutionProvider"]
+        if "XnnpackExecutionProvider" in ort.get_available_providers():
+            providers.insert(0, ("XnnpackExecutionProvider", {"intra_op_num_threads": self.num_threads}))
+        return ort.InferenceSession(model_path, sess_options=options, providers=providers)
+
+    def _tune_onnx_sessions(self, model_paths: list):
+        """
+        Replace the sessions openwakeword created with default options.
+        Covers the shared melspectrogram/embedding models and every wake word model.
+        """
+        features = self.model.preprocessor
+        resources = os.path.join(os.path.dirname(openwakeword.__file__), "resources", "models")
+        # The preprocessor's predict lambdas look these attributes up on each call
+        features.melspec_model = self._build_session(os.path.join(resources, "melspectrogram.onnx"))
+        features.embedding_model = self._build_session(os.path.join(resources, "embedding_model.onnx"))
+
+        for model_path, name in zip(model_paths, list(self.model.models)):
+            session = self._build_session(model_path)
+            input_name = session.get_inputs()[0].name  # looked up once, not per prediction
+            self.model.models[name] = session
+            self.model.model_prediction_function[name] = (
+                lambda x, session=session, input_name=input_name: session.run(None, {input_name: x}))
+
+    def detect(self, audio_chunk) -> bool:
+        """
+        Add an audio chunk (int16 samples or raw bytes) and check for the wake word.
+        The model only runs once the tile holds batch_chunks chunks; until then this returns False.
+        """
+        # Raw bytes still need wrapping; int16 arrays from the recorder are used directly
+        if not isinstance(audio_chunk, np.ndarray):
+            audio_chunk = np.frombuffer(audio_chunk, dtype=np.int16)
+
+        n = audio_chunk.size
+        if self._fill + n > self._tile.size:
+            # Chunk larger than expected - run what we have and make room
+            detected = self.flush()
+            if n * self.batch_chunks > self._tile.size:
+                self._tile = np.empty(n * self.batch_chunks, dtype=np.int16)
+            if detected:
+                return True
+
+        self._tile[self._fill:self._fill + n] = audio_chunk  # same dtype - a plain copy
+        self._fill += n
+
+        # Run the model once another chunk of this size no longer fits
+        if self._fill + n > self._tile.size:
+            return self.flush()
+        return False
+
+    def flush(self) -> bool:
+        """Run the model on whatever is buffered in the tile, even if it isn't full"""
+        if self._fill == 0:
+            return False
+
         # Get predictions
-        predictions = self.model.predict(audio_array)
+        predictions = self.model.predict(self._tile[:self._fill])
+        self._fill = 0
+        self.last_scores = predictions
         
         # Check if any wake word exceeds threshold
-        for wake_word, confidence in predictions.items():
-            if confidence > self.threshold:
-                # print(f"Wake word '{wake_word}' detected with confidence {confidence:.2f}")
-                return True
+        top = max(predictions.values(), default=0.0)
+        if not self._armed:
+            # Re-arm only once the previous detection has died down
+            self._armed = top < self.release_threshold
+            return False
+        if top > self.threshold:
+            # print(f"Wake word detected with confidence {top:.2f}")
+            self._armed = False
+            return True
         
         return False
     
+    def warmup(self):
+        """Run one dummy prediction so the first real chunk doesn't pay ONNX session start-up"""
+        self.model.predict(np.zeros(1280, dtype=np.int16))
+        self.reset()
+
+    def set_batch(self, batch_chunks: int):
+        """
+        Change how many chunks are gathered per model call (e.g. a bigger batch while muted,
+        when reaction time matters less). The newest buffered samples are kept.
+        """
+        if batch_chunks == self.batch_chunks:
+            return
+        chunk_size = self._tile.size // self.batch_chunks
+        tile = np.empty(chunk_size * batch_chunks, dtype=np.int16)
+        keep = min(self._fill, tile.size)
+        tile[:keep] = self._tile[self._fill - keep:self._fill]
+        self._tile = tile
+        self._fill = keep
+        self.batch_chunks = batch_chunks
+
     def set_threshold(self, threshold: float):
         """Adjust detection sensitivity"""
         self.threshold = threshold
+        self.release_threshold = threshold * 0.5
     
     def reset(self):
         """Reset the wake word model state to clear internal audio buffers"""
+        self._fill = 0
+        self._armed = True
+        self.last_scores = {}
         self.model.reset()
\ No newline at end of file
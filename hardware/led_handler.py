@@ -1,6 +1,5 @@
 import lgpio
 import time
-import threading
 
 class LED:
     """Controls R2-D2's two LEDs: status (red) and flashlight"""
@@ -16,7 +15,6 @@ class LED:
 
         self._status_on = False
         self._flashlight_on = False
-        self._blink_stop_event = threading.Event()
 
     def set_status_light(self, on: bool):
         """Set the red status LED on or off"""
@@ -28,42 +26,48 @@ class LED:
         self._flashlight_on = on
         lgpio.gpio_write(self.h, self.FLASHLIGHT_PIN, 1 if on else 0)
 
+    def _start_pwm(self, pin: int, hz: float, cycles: int = 0):
+        """
+        Let lgpio toggle the pin at hz with a 50% duty cycle - no Python loop involved.
+        cycles > 0 stops after exactly that many blinks, 0 runs until _stop_pwm().
+        """
+        lgpio.tx_pwm(self.h, pin, hz, 50.0, 0, cycles)
+
+    def _stop_pwm(self, pin: int):
+        """Stop PWM on the pin and leave it low"""
+        lgpio.tx_pwm(self.h, pin, 0, 0)
+        lgpio.gpio_write(self.h, pin, 0)
+
     def blink_status_light(self, hz: float = 2.0, seconds: float = 1.5):
         """Blink the status LED at a given frequency for a duration in seconds"""
-        interval = 1.0 / hz / 2  # half period (on time = off time)
-        count = int(hz * seconds)
-        for _ in range(count):
-            self.set_status_light(True)
-            time.sleep(interval)
-            self.set_status_light(False)
-            time.sleep(interval)
+        # lgpio counts the cycles, so the blink count is exact and doesn't drift
+        cycles = int(hz * seconds)
+        if cycles <= 0:
+            return
+        self._start_pwm(self.STATUS_PIN, hz, cycles)
+        time.sleep(cycles / hz)
+        self._stop_pwm(self.STATUS_PIN)
+        self._status_on = False
 
     def blink_flashlight(self, hz: float = 2.0, seconds: float = 1.5):
         """Blink the flashlight LED at a given frequency for a duration in seconds"""
-        interval = 1.0 / hz / 2
-        count = int(hz * seconds)
-        for _ in range(count):
-            self.set_flashlight(True)
-            time.sleep(interval)
-            self.set_flashlight(False)
-            time.sleep(interval)
+        # lgpio counts the cycles, so the blink count is exact and doesn't drift
+        cycles = int(hz * seconds)
+        if cycles <= 0:
+            return
+        self._start_pwm(self.FLASHLIGHT_PIN, hz, cycles)
+        time.sleep(cycles / hz)
+        self._stop_pwm(self.FLASHLIGHT_PIN)
+        self._flashlight_on = False
 
     def blink_status_light_continuous(self, hz: float = 2.0):
-        """Blink the status LED indefinitely until stop_blink_status_light_continuous() is called"""
-        self._blink_stop_event.clear()
-        interval = 1.0 / hz / 2
-        while not self._blink_stop_event.is_set():
-            self.set_status_light(True)
-            if self._blink_stop_event.wait(interval):
-                break
-            self.set_status_light(False)
-            if self._blink_stop_event.wait(interval):
-                break
-        self.set_status_light(False)
+        """Start blinking the status LED until stop_blink_status_light_continuous() is called (non-blocking)"""
+        self._start_pwm(self.STATUS_PIN, hz)
 
     def stop_blink_status_light_continuous(self):
-        """Stop the indefinite blink loop"""
-        self._blink_stop_event.set()
+        """Stop the indefinite blink"""
+        self._stop_pwm(self.STATUS_PIN)
+        self._status_on = False
 
     def cleanup(self):
         """Turn off both LEDs and release GPIO"""
@@ -1,11 +1,83 @@
 #!/usr/bin/env python3
 import time
-import os
-from rpi_hardware_pwm import HardwarePWM
+import logging
+import numpy as np
+from pwm_handler import get_pwm, release_pwm
+
+# numba is optional - without it the kernels below run as plain Python
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+log = logging.getLogger(__name__)
 
 CAM_FOV = 77    # degrees
 IMG_WIDTH = 640 # pixels
 
+def angle_to_duty_cycle(angle):
+    """Convert angle (0-180) to duty cycle percentage (2.5-12.5%)"""
+    # 0° = 2.5%, 90° = 7.5%, 180° = 12.5%
+    return 2.5 + (angle / 180.0) * 10.0
+
+# Duty cycle for every 0.1° from 0 to 180, so hot paths index instead of doing float math.
+# Index with int(angle * 10) for an angle already clamped to 0-180.
+DUTY_LUT = tuple(angle_to_duty_cycle(tenths / 10.0) for tenths in range(1801))
+
+def duty_sweep(start, target_angle, step=1):
+    """Duty cycles for every step-degree angle from start to target_angle (whole degrees, inclusive)"""
+    if target_angle >= start:
+        return DUTY_LUT[start * 10:target_angle * 10 + 1:step * 10]
+    # Slice stop is exclusive - None when the sweep has to include 0°
+    stop = target_angle * 10 - 1 if target_angle > 0 else None
+    return DUTY_LUT[start * 10:stop:-step * 10]
+
+# PID state layout shared by the kernels: [prev_error, prev_derivative, integral]
+PREV_ERROR, PREV_DERIVATIVE, INTEGRAL = 0, 1, 2
+
+@njit(cache=True, fastmath=True)
+def pid_update(error, dt, state, Kp, Ki, Kd, derivative_filter, integral_limit):
+    """PID output for error, updating state in place"""
+    # Proportional term
+    P = Kp * error
+
+    # Integral term (accumulated error) with anti-windup
+    integral = state[INTEGRAL] + error * dt
+    # Clamp integral to prevent windup
+    integral = integral_limit if integral > integral_limit else -integral_limit if integral < -integral_limit else integral
+    I = Ki * integral
+
+    # Derivative term with low-pass filter to reduce noise
+    derivative = (error - state[PREV_ERROR]) / dt
+    filtered_derivative = (derivative_filter * derivative +
+                           (1 - derivative_filter) * state[PREV_DERIVATIVE])
+    D = Kd * filtered_derivative
+
+    state[PREV_ERROR] = error
+    state[PREV_DERIVATIVE] = filtered_derivative
+    state[INTEGRAL] = integral
+
+    return P + I + D
+
+@njit(cache=True, fastmath=True)
+def pid_track_step(pixel_offset, current_angle, state, degrees_per_pixel,
+                   Kp, Ki, Kd, derivative_filter, integral_limit, max_change):
+    """Pixel offset → rate-limited, clamped whole-degree target angle"""
+    # Convert pixel error to angle error
+    angle_change = pid_update(pixel_offset * degrees_per_pixel, 1.0, state,
+                              Kp, Ki, Kd, derivative_filter, integral_limit)
+
+    # Apply rate limiting (prevent large jumps)
+    angle_change = max_change if angle_change > max_change else -max_change if angle_change < -max_change else angle_change
+
+    # Calculate target with hardware limits
+    target_angle = int(current_angle + angle_change)
+    return 0 if target_angle < 0 else 180 if target_angle > 180 else target_angle
+
 class PIDController:
     """Simple PID controller for smooth tracking"""
     def __init__(self, Kp=0.8, Ki=0.0, Kd=0.3, derivative_filter=0.8, integral_limit=50):
@@ -15,9 +87,20 @@ class PIDController:
         self.derivative_filter = derivative_filter  # Low-pass filter (0-1, lower = more filtering)
         self.integral_limit = integral_limit  # Anti-windup limit
 
-        self.prev_error = 0
-        self.prev_derivative = 0
-        self.integral = 0
+        # [prev_error, prev_derivative, integral] - updated in place by the kernels
+        self.state = np.zeros(3)
+
+    @property
+    def prev_error(self):
+        return self.state[PREV_ERROR]
+
+    @property
+    def prev_derivative(self):
+        return self.state[PREV_DERIVATIVE]
+
+    @property
+    def integral(self):
+        return self.state[INTEGRAL]
 
     def update(self, error, dt=1.0):
         """
@@ -28,86 +111,74 @@ class PIDController:
         Returns:
             Control output (angle change in degrees)
         """
-        # Proportional term
-        P = self.Kp * error
-
-        # Integral term (accumulated error) with anti-windup
-        self.integral += error * dt
-        # Clamp integral to prevent windup
-        self.integral = max(-self.integral_limit, min(self.integral_limit, self.integral))
-        I = self.Ki * self.integral
-
-        # Derivative term with low-pass filter to reduce noise
-        derivative = (error - self.prev_error) / dt
-        filtered_derivative = (self.derivative_filter * derivative +
-                              (1 - self.derivative_filter) * self.prev_derivative)
-        D = self.Kd * filtered_derivative
-
-        self.prev_error = error
-        self.prev_derivative = filtered_derivative
-
-        return P + I + D
+        return pid_update(float(error), float(dt), self.state, self.Kp, self.Ki, self.Kd,
+                          self.derivative_filter, self.integral_limit)
 
     def reset(self):
         """Reset PID state"""
-        self.prev_error = 0
-        self.prev_derivative = 0
-        self.integral = 0
+        self.state[:] = 0.0
 
 class Motor:
     def __init__(self, servo_pin=12, debug=False):
         """Initialize motor control"""
         self.servo_pin = servo_pin
         self.debug = debug
+        if debug:
+            log.setLevel(logging.DEBUG)
 
         # Initialize hardware PWM (GPIO 12 = PWM channel 0)
         # Standard servo: 50Hz, duty cycle 2.5% = 0°, 7.5% = 90°, 12.5% = 180°
-        self.pwm = HardwarePWM(pwm_channel=0, hz=50)
-        self.pwm.start(0)
+        self.pwm = get_pwm(pwm_channel=0, hz=50)
 
         # Always start at home position (90°)
         self.current_angle = 90
         if self.debug:
-            print(f"Motor initialized at {self.current_angle}°")
+            log.debug("Motor initialized at %s°", self.current_angle)
 
         # Control parameters
         self.pixels_per_degree = IMG_WIDTH/CAM_FOV
+        self._degrees_per_pixel = 1.0 / self.pixels_per_degree
 
         # PID control parameters
         self.MAX_SPEED_PER_UPDATE = 5.0
         self.MIN_MOVEMENT = 0.5
+        self.PIXEL_DEADBAND = 5  # pixels right of centre - too small to move the servo, skip the PID math
 
         self.pid = PIDController(Kp=0.2, Ki=0.0, Kd=0.0)
+
+        # Last (offset, angle) pair that produced no movement - only recorded while the
+        # PID is pure-P (Ki = Kd = 0), when the output depends on nothing else
+        self._noop_offset = None
+        self._noop_angle = None
+
+        # Compile (or load the cached) kernels now rather than on the first tracked frame - with
+        # the live gains and limits, so numba builds the same specialization the tracking calls use
+        pid = self.pid
+        pid_track_step(0.0, self.current_angle, np.zeros(3), self._degrees_per_pixel,
+                       pid.Kp, pid.Ki, pid.Kd, pid.derivative_filter, pid.integral_limit,
+                       self.MAX_SPEED_PER_UPDATE)
     
     def clamp_angle(self, angle):
         """Clamp angle to valid range 0-180"""
-        return int(max(0, min(180, angle)))
+        angle = int(angle)
+        return 0 if angle < 0 else 180 if angle > 180 else angle
 
     def angle_to_duty_cycle(self, angle):
         """Convert angle (0-180) to duty cycle percentage (2.5-12.5%)"""
-        # 0° = 2.5%, 90° = 7.5%, 180° = 12.5%
-        return 2.5 + (angle / 180.0) * 10.0
+        return angle_to_duty_cycle(angle)
 
     def set_angle(self, angle):
         """Move motor instantly to angle"""
         angle = self.clamp_angle(angle)
-        duty = self.angle_to_duty_cycle(angle)
-        self.pwm.change_duty_cycle(duty)
+        self.pwm.change_duty_cycle(DUTY_LUT[angle * 10])
         time.sleep(0.05)
         self.current_angle = angle
 
     def move_slow(self, target_angle, step=1):
         """Move motor slowly from current position to target angle"""
         target_angle = int(self.clamp_angle(target_angle))
-        start = self.current_angle
-
-        if target_angle > start:
-            angles = range(start, target_angle + 1, step)
-        else:
-            angles = range(start, target_angle - 1, -step)
-
-        for angle in angles:
-            duty = self.angle_to_duty_cycle(angle)
+        # Whole sweep is sliced out of the lookup table up front
+        for duty in duty_sweep(self.current_angle, target_angle, step):
             self.pwm.change_duty_cycle(duty)
             time.sleep(0.02)
 
@@ -123,32 +194,39 @@ class Motor:
         Returns:
             bool: True if moved, False if no movement needed
         """
-        # Convert pixel error to angle error
-        angle_error = pixel_offset / self.pixels_per_degree
-
-        # Update PID controller
-        angle_change = self.pid.update(error=angle_error)
+        # Locked on target (the steady state) - nothing to compute. One-sided on purpose: the
+        # target angle is truncated towards zero, so any negative offset still steps one degree
+        if 0 <= pixel_offset < self.PIXEL_DEADBAND:
+            return False
 
-        # Apply rate limiting (prevent large jumps)
-        angle_change = max(-self.MAX_SPEED_PER_UPDATE,
-                          min(self.MAX_SPEED_PER_UPDATE, angle_change))
+        # Same offset from the same position as a frame that didn't move - same answer
+        if pixel_offset == self._noop_offset and self.current_angle == self._noop_angle:
+            return False
 
-        # Calculate target with hardware limits
-        target_angle = self.clamp_angle(self.current_angle + angle_change)
+        # PID update, rate limiting and clamping in one compiled call
+        pid = self.pid
+        target_angle = pid_track_step(float(pixel_offset), self.current_angle, pid.state,
+                                      self._degrees_per_pixel, pid.Kp, pid.Ki, pid.Kd,
+                                      pid.derivative_filter, pid.integral_limit,
+                                      self.MAX_SPEED_PER_UPDATE)
 
         # Verify actual movement is significant
-        if abs(target_angle - self.current_angle) < self.MIN_MOVEMENT:
+        moved = target_angle - self.current_angle
+        if -self.MIN_MOVEMENT < moved < self.MIN_MOVEMENT:
+            if pid.Ki == 0 and pid.Kd == 0:
+                self._noop_offset = pixel_offset
+                self._noop_angle = self.current_angle
             return False
 
         # Update servo position with hardware PWM
-        duty = self.angle_to_duty_cycle(target_angle)
-        self.pwm.change_duty_cycle(duty)
+        self.pwm.change_duty_cycle(DUTY_LUT[target_angle * 10])
 
         # Update state
         self.current_angle = target_angle
 
         if self.debug:
-            print(f"PID: offset={pixel_offset:+4d}px ({angle_error:+.1f}°) → Δ={angle_change:+.1f}° → target={target_angle:.0f}°")
+            log.debug("PID: offset=%+4dpx (%+.1f°) → Δ=%+d° → target=%d°",
+                      pixel_offset, pixel_offset * self._degrees_per_pixel, moved, target_angle)
 
         return True
     
@@ -167,6 +245,6 @@ class Motor:
 
     def cleanup(self):
         """Clean up hardware PWM"""
-        self.pwm.stop()
+        release_pwm(pwm_channel=0, hz=50)
         if self.debug:
-            print(f"Motor cleaned up at position {self.current_angle}°")
\ No newline at end of file
+            log.debug("Motor cleaned up at position %s°", self.current_angle)
\ No newline at end of file
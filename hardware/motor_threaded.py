@@ -1,32 +1,169 @@
 #!/usr/bin/env python3
-import time
 import os
-import threading
-import math
-from rpi_hardware_pwm import HardwarePWM
-
-CAM_FOV = 77    # degrees
-IMG_WIDTH = 640 # pixels
+import time
+import logging
+import multiprocessing as mp
+from pwm_handler import get_pwm, release_pwm
+
+# Camera geometry and duty-cycle mapping are shared with the direct PID motor
+# numba is optional - motor's njit falls back to plain Python without it
+from motor import CAM_FOV, IMG_WIDTH, DUTY_LUT, angle_to_duty_cycle, duty_sweep, njit
+
+log = logging.getLogger(__name__)
+
+@njit(cache=True, fastmath=True)
+def control_step(target, current, sigmoid_scale, max_speed, dt, min_movement):
+    """
+    One tick of the S-curve interpolation towards target.
+    Returns the new angle (0-180), or -1.0 if the step is too small to move.
+    """
+    # tanh-shaped S-curve: slow start → fast middle → slow end.
+    # Rational approximation of tanh, exact at 0 and reaching ±1 at |x| = 3 (within ~2% between)
+    x = (target - current) / sigmoid_scale
+    if x >= 3.0:
+        smooth_factor = 1.0
+    elif x <= -3.0:
+        smooth_factor = -1.0
+    else:
+        x2 = x * x
+        smooth_factor = x * (27.0 + x2) / (27.0 + 9.0 * x2)
+    step = smooth_factor * max_speed * dt
+    if abs(step) <= min_movement * dt:
+        return -1.0
+    new_angle = current + step
+    return 0.0 if new_angle < 0.0 else 180.0 if new_angle > 180.0 else new_angle
+
+@njit(cache=True, fastmath=True)
+def offset_target_step(pixel_offset, ema_offset, ema_alpha, deadband, pixels_per_degree, current):
+    """
+    EMA smoothing, deadband and dual-zone gain for one detection.
+    Returns (new_ema_offset, target_angle, Kp) - target_angle is -1.0 inside the deadband.
+    """
+    # EMA filter - smooth noisy YOLO detections (incremental form: one multiply, O(1) state)
+    ema_offset += ema_alpha * (pixel_offset - ema_offset)
+
+    # Deadband - ignore small offsets to prevent jitter from camera noise
+    if abs(ema_offset) < deadband:
+        return ema_offset, -1.0, 0.0
+
+    # Dual-zone: high Kp for large errors (fast tracking), low Kp for small errors (stability)
+    Kp = 0.12 if abs(ema_offset) > 100 else 0.1
+    target = current + ema_offset / pixels_per_degree * Kp
+    return ema_offset, 0.0 if target < 0.0 else 180.0 if target > 180.0 else target, Kp
+
+def _control_loop_proc(shared_target, shared_current, running, sigmoid_scale, max_speed, min_movement, debug):
+    """
+    High-frequency motor control loop (runs in its own process at ~100 Hz).
+    Smoothly interpolates current angle towards target angle.
+    """
+    if debug:
+        # This process writes its own log output: a spawned child starts unconfigured, and a
+        # forked one inherits a queue handler whose listener only runs in the parent
+        logging.basicConfig(format="%(message)s", force=True)
+        log.setLevel(logging.DEBUG)
+
+    # Real-time priority when allowed (needs root or CAP_SYS_NICE)
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(50))
+    except (AttributeError, OSError):
+        if debug:
+            log.debug("[Motor loop: SCHED_FIFO unavailable, using normal priority]")
+
+    # A forked child inherits the parent's handle; a spawned one sets the channel up itself
+    pwm = get_pwm(pwm_channel=0, hz=50)
+
+    # Only this process writes the current angle, so it lives in a local and is published on change
+    current = shared_current.value
+    pwm.change_duty_cycle(DUTY_LUT[int(current * 10)])
+
+    loop_rate = 100  # Hz
+    dt = 1.0 / loop_rate
+    dt_ns = 1_000_000_000 // loop_rate
+
+    # Sleep until SPIN_NS before the deadline, then spin the rest (sleep() overshoots)
+    SPIN_NS = 200_000
+    WAKE_EARLY_NS = 100_000
+
+    # Hot-loop lookups bound to locals once
+    set_duty = pwm.change_duty_cycle
+    duty_lut = DUTY_LUT
+    monotonic_ns = time.monotonic_ns
+    sleep = time.sleep
+    is_running = running.is_set
+
+    # For rate monitoring
+    loop_count = 0
+    dropped = 0
+    rate_timer = monotonic_ns()
+
+    # Target the motor last came to rest at. Until the target changes, control_step would
+    # keep returning "no move" for the same (target, current) pair, so it isn't called
+    settled_target = -1.0
+
+    # Absolute deadlines on the monotonic clock - sleep error doesn't accumulate
+    next_deadline = monotonic_ns() + dt_ns
+
+    while is_running():
+        # Single lock-free read of the target the main process publishes
+        target = shared_target.value
+        if target != settled_target:
+            # Sigmoid S-curve for smooth acceleration/deceleration
+            new_angle = control_step(target, current, sigmoid_scale, max_speed, dt, min_movement)
+
+            # Only update if movement is significant
+            if new_angle >= 0.0:
+                current = new_angle
+                shared_current.value = new_angle
+
+                # Send PWM command
+                set_duty(duty_lut[int(new_angle * 10)])
+            else:
+                settled_target = target
+
+        # Maintain loop rate
+        now = monotonic_ns()
+        if now - next_deadline > dt_ns:
+            # Missed a whole tick - re-anchor instead of bursting to catch up
+            dropped += 1
+            next_deadline = now + dt_ns
+        else:
+            if now < next_deadline - SPIN_NS:
+                sleep((next_deadline - now - WAKE_EARLY_NS) / 1e9)
+            while monotonic_ns() < next_deadline:
+                pass
+            next_deadline += dt_ns
+
+        # Print actual loop rate every second
+        loop_count += 1
+        now = monotonic_ns()
+        if now - rate_timer >= 1_000_000_000:
+            if debug:
+                log.debug("[Motor loop: %.1f Hz, %d dropped]", loop_count, dropped)
+            loop_count = 0
+            dropped = 0
+            rate_timer = now
 
 class Motor:
     def __init__(self, servo_pin=12, debug=False):
         """Initialize threaded motor control"""
         self.servo_pin = servo_pin
         self.debug = debug
+        if debug:
+            log.setLevel(logging.DEBUG)
 
         # Initialize hardware PWM (GPIO 12 = PWM channel 0)
         # Standard servo: 50Hz, duty cycle 2.5% = 0°, 7.5% = 90°, 12.5% = 180°
-        self.pwm = HardwarePWM(pwm_channel=0, hz=50)
-        self.pwm.start(0)
+        self.pwm = get_pwm(pwm_channel=0, hz=50)
 
-        # Thread-safe variables
-        self.lock = threading.Lock()
-        self.target_angle = 90.0  # Target angle (updated by main thread)
-        self.current_angle = 90.0  # Current angle (updated by motor thread)
+        # Shared with the control process. Single writer each (main → target, motor → current),
+        # and an aligned double store can't tear, so RawValue skips the per-access lock
+        self._shared_target = mp.RawValue('d', 90.0)
+        self._shared_current = mp.RawValue('d', 90.0)
 
-        # Thread control
+        # Process control
         self.running = False
-        self.motor_thread = None
+        self._running_flag = mp.Event()
+        self.motor_process = None
 
         # Control parameters
         self.pixels_per_degree = IMG_WIDTH / CAM_FOV  # 640px/77° ≈ 8.3 px/deg
@@ -42,144 +179,104 @@ class Motor:
         self.sigmoid_scale = 9.0  # Scaling factor for sigmoid curve (higher = smoother)
 
         if self.debug:
-            print(f"Motor initialized at {self.current_angle}°")
+            log.debug("Motor initialized at %s°", self.current_angle)
+
+    @property
+    def target_angle(self):
+        """Target angle (updated by main process)"""
+        return self._shared_target.value
+
+    @target_angle.setter
+    def target_angle(self, angle):
+        self._shared_target.value = angle
+
+    @property
+    def current_angle(self):
+        """Current angle (updated by motor process)"""
+        return self._shared_current.value
+
+    @current_angle.setter
+    def current_angle(self, angle):
+        self._shared_current.value = angle
 
     def clamp_angle(self, angle):
         """Clamp angle to valid range 0-180"""
-        return max(0.0, min(180.0, angle))
+        return 0.0 if angle < 0.0 else 180.0 if angle > 180.0 else angle
 
     def angle_to_duty_cycle(self, angle):
         """Convert angle (0-180) to duty cycle percentage (2.5-12.5%)"""
-        # 0° = 2.5%, 90° = 7.5%, 180° = 12.5%
-        return 2.5 + (angle / 180.0) * 10.0
+        return angle_to_duty_cycle(angle)
 
     def set_target_from_offset(self, pixel_offset):
         """
         Update target angle from pixel offset (called by main thread at ~60 FPS).
-        Thread-safe, non-blocking.
+        Process-safe, non-blocking.
 
         Args:
             pixel_offset: Signed pixel offset from center (-320 to +320)
         """
-        # EMA filter - smooth noisy YOLO detections
-        self.ema_offset = self.ema_alpha * pixel_offset + (1 - self.ema_alpha) * self.ema_offset
-        pixel_offset = self.ema_offset
-
-        # Deadband - ignore small offsets to prevent jitter from camera noise
-        if abs(pixel_offset) < self.DEADBAND_PIXELS:
-            return  # Don't update target, motor stays steady
-
-        # Convert pixel error to angle error
-        angle_error = pixel_offset / self.pixels_per_degree
-
-        # Calculate desired target
-        # Dual-zone: high Kp for large errors (fast tracking), low Kp for small errors (stability)
-        if abs(pixel_offset) > 100:
-            Kp = 0.12  # Aggressive tracking when far from target
-        else:
-            Kp = 0.1  # Gentle when near target to prevent oscillation
-
-        angle_change = angle_error * Kp
-
-        # Update target angle (thread-safe)
-        with self.lock:
-            self.target_angle = self.clamp_angle(self.current_angle + angle_change)
-            if self.debug:
-                print(f"Target update: offset={pixel_offset:+6.1f}px ({angle_error:+.1f}°) → target={self.target_angle:.1f}° | Kp={Kp}")
-
-    def _control_loop(self):
-        """
-        High-frequency motor control loop (runs in separate thread at ~100 Hz).
-        Smoothly interpolates current angle towards target angle.
-        """
-        loop_rate = 100  # Hz
-        dt = 1.0 / loop_rate
-
-        # For rate monitoring
-        loop_count = 0
-        rate_timer = time.time()
-
-        while self.running:
-            loop_start = time.time()
-
-            with self.lock:
-                # Calculate error
-                error = self.target_angle - self.current_angle
-
-                # Sigmoid S-curve for smooth acceleration/deceleration
-                # tanh creates smooth transitions: slow start → fast middle → slow end
-                normalized_error = error / self.sigmoid_scale
-                smooth_factor = math.tanh(normalized_error)  # Returns -1 to 1, smooth S-curve
-
-                # Calculate step based on smooth factor
-                step = smooth_factor * self.MAX_SPEED * dt
-
-                # Only update if movement is significant
-                if abs(step) > self.MIN_MOVEMENT * dt:
-                    self.current_angle += step
-                    self.current_angle = self.clamp_angle(self.current_angle)
-
-                    # Send PWM command
-                    duty = self.angle_to_duty_cycle(self.current_angle)
-                    self.pwm.change_duty_cycle(duty)
-
-            # Maintain loop rate
-            elapsed = time.time() - loop_start
-            sleep_time = dt - elapsed
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-
-            # Print actual loop rate every 3 seconds
-            loop_count += 1
-            if time.time() - rate_timer >= 1.0:
-                actual_rate = loop_count / 1.0
-                if self.debug:
-                    print(f"[Motor loop: {actual_rate:.1f} Hz]")
-                loop_count = 0
-                rate_timer = time.time()
+        # Smoothing, deadband and gain schedule in one compiled call
+        self.ema_offset, target, Kp = offset_target_step(float(pixel_offset), self.ema_offset, self.ema_alpha,
+                                                         self.DEADBAND_PIXELS, self.pixels_per_degree,
+                                                         self.current_angle)
+        if target < 0.0:
+            return  # Inside the deadband - motor stays steady
+
+        # Update target angle (only this process writes it)
+        self.target_angle = target
+        if self.debug:
+            log.debug("Target update: offset=%+6.1fpx (%+.1f°) → target=%.1f° | Kp=%s",
+                      self.ema_offset, self.ema_offset / self.pixels_per_degree, target, Kp)
 
     def start_control_loop(self):
-        """Start the motor control thread"""
+        """Start the motor control process"""
         if self.running:
             if self.debug:
-                print("Motor control loop already running")
+                log.debug("Motor control loop already running")
             return
 
+        # Compile (or load the cached) kernels now rather than on the first control tick / detection
+        control_step(90.0, 90.0, self.sigmoid_scale, self.MAX_SPEED, 0.01, self.MIN_MOVEMENT)
+        offset_target_step(0.0, 0.0, self.ema_alpha, self.DEADBAND_PIXELS, self.pixels_per_degree, 90.0)
+
         self.running = True
-        self.motor_thread = threading.Thread(target=self._control_loop, daemon=True)
-        self.motor_thread.start()
+        self._running_flag.set()
+        self.motor_process = mp.Process(
+            target=_control_loop_proc,
+            args=(self._shared_target, self._shared_current, self._running_flag,
+                  self.sigmoid_scale, self.MAX_SPEED, self.MIN_MOVEMENT, self.debug),
+            daemon=True,
+        )
+        self.motor_process.start()
         if self.debug:
-            print("Motor control loop started (100 Hz)")
+            log.debug("Motor control loop started (100 Hz)")
 
     def stop_control_loop(self):
-        """Stop the motor control thread"""
+        """Stop the motor control process"""
         if not self.running:
             return
 
         self.running = False
-        if self.motor_thread:
-            self.motor_thread.join(timeout=1.0)
+        self._running_flag.clear()
+        if self.motor_process:
+            self.motor_process.join(timeout=1.0)
+            if self.motor_process.is_alive():
+                self.motor_process.terminate()
+            self.motor_process = None
         if self.debug:
-            print("Motor control loop stopped")
+            log.debug("Motor control loop stopped")
 
     def move_slow(self, target_angle, step=1):
         """Move motor slowly from current position to target angle (blocking)"""
         target_angle = int(self.clamp_angle(target_angle))
-        start = int(self.current_angle)
-
-        if target_angle > start:
-            angles = range(start, target_angle + 1, step)
-        else:
-            angles = range(start, target_angle - 1, -step)
 
-        for angle in angles:
-            duty = self.angle_to_duty_cycle(angle)
+        # Whole sweep is sliced out of the lookup table up front
+        for duty in duty_sweep(int(self.current_angle), target_angle, step):
             self.pwm.change_duty_cycle(duty)
             time.sleep(0.02)
 
-        with self.lock:
-            self.current_angle = float(target_angle)
-            self.target_angle = float(target_angle)
+        self.current_angle = float(target_angle)
+        self.target_angle = float(target_angle)
 
     def move_home(self):
         """Move to home position (90°)"""
@@ -194,8 +291,8 @@ class Motor:
             pass
 
     def cleanup(self):
-        """Clean up hardware PWM and stop thread"""
+        """Clean up hardware PWM and stop control process"""
         self.stop_control_loop()
-        self.pwm.stop()
+        release_pwm(pwm_channel=0, hz=50)
         if self.debug:
-            print(f"Motor cleaned up at position {self.current_angle:.1f}°")
\ No newline at end of file
+            log.debug("Motor cleaned up at position %.1f°", self.current_angle)
@@ -0,0 +1,65 @@
+import os
+from rpi_hardware_pwm import HardwarePWM, HardwarePWMException
+
+class SysfsPWM(HardwarePWM):
+    """
+    HardwarePWM that keeps the channel's duty_cycle file open.
+    rpi_hardware_pwm opens, writes and closes the sysfs file on every duty change;
+    this rewrites the already-open file in place with a single pwrite().
+    """
+    def __init__(self, pwm_channel: int, hz: float, chip: int = 0):
+        # Set before super().__init__: some library versions change the frequency (and with it
+        # the duty cycle) from their constructor, before the file below is open
+        self._duty_fd = None
+        self._period_ns = 1_000_000_000 / float(hz)
+        super().__init__(pwm_channel=pwm_channel, hz=hz, chip=chip)
+        self._duty_fd = os.open(os.path.join(self.pwm_dir, "duty_cycle"), os.O_WRONLY)
+
+    def change_duty_cycle(self, duty_cycle: float) -> None:
+        """Duty cycle in percent (0-100)"""
+        if self._duty_fd is None:
+            super().change_duty_cycle(duty_cycle)  # Still being set up - the library writes it
+            return
+        if not (0 <= duty_cycle <= 100):
+            raise HardwarePWMException("Duty cycle must be between 0 and 100 (inclusive).")
+        self._duty_cycle = duty_cycle
+        os.pwrite(self._duty_fd, b"%d\n" % int(self._period_ns * duty_cycle / 100), 0)
+
+    def change_frequency(self, hz: float) -> None:
+        self._period_ns = 1_000_000_000 / float(hz)
+        super().change_frequency(hz)
+
+    def close(self):
+        """Close the held duty_cycle file"""
+        if self._duty_fd is not None:
+            os.close(self._duty_fd)
+            self._duty_fd = None
+
+# One PWM per (channel, hz), shared by every Motor that asks for it.
+# Setting a channel up writes several sysfs files, so it's only done once.
+_pwm_cache = {}
+_pwm_refs = {}
+
+def get_pwm(pwm_channel: int = 0, hz: float = 50) -> SysfsPWM:
+    """Return the shared, started PWM for this channel and frequency"""
+    key = (pwm_channel, hz)
+    pwm = _pwm_cache.get(key)
+    if pwm is None:
+        pwm = SysfsPWM(pwm_channel=pwm_channel, hz=hz)
+        pwm.start(0)
+        _pwm_cache[key] = pwm
+        _pwm_refs[key] = 0
+    _pwm_refs[key] += 1
+    return pwm
+
+def release_pwm(pwm_channel: int = 0, hz: float = 50):
+    """Drop one reference to the shared PWM - the last release stops it"""
+    key = (pwm_channel, hz)
+    if key not in _pwm_cache:
+        return
+    _pwm_refs[key] -= 1
+    if _pwm_refs[key] <= 0:
+        pwm = _pwm_cache.pop(key)
+        pwm.stop()
+        pwm.close()
+        del _pwm_refs[key]
@@ -1,11 +1,8 @@
 import RPi.GPIO as GPIO
 import time
 
-GPIO.setmode(GPIO.BCM)
 LED_PIN = 27  # Change to your GPIO pin
 
-GPIO.setup(LED_PIN, GPIO.OUT)
-
 def blink(interval=2):
     while True:
         GPIO.output(LED_PIN, GPIO.HIGH)
@@ -13,9 +10,17 @@ def blink(interval=2):
         GPIO.output(LED_PIN, GPIO.LOW)
         time.sleep(interval)
 
-try:
-    print("blinking led")
-    blink(2)
-except KeyboardInterrupt:
-    print("failed")
-    GPIO.cleanup()
\ No newline at end of file
+def main():
+    # GPIO setup only happens when run as a script, so importing this file has no side effects
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(LED_PIN, GPIO.OUT)
+
+    try:
+        print("blinking led")
+        blink(2)
+    except KeyboardInterrupt:
+        print("failed")
+        GPIO.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 import time
 import argparse
-import os
+import functools
+from pathlib import Path
 from rpi_hardware_pwm import HardwarePWM
 
 SERVO_PIN = 12  # GPIO 12 = PWM0
-POSITION_FILE = 'motor_position.txt'
+POSITION_FILE = Path('motor_position.txt')
 
 # Initialize hardware PWM
 # GPIO 12 = PWM channel 0, GPIO 13 = PWM channel 1
@@ -15,20 +16,37 @@ pwm.start(0)  # Start with 0% duty cycle
 
 def clamp_angle(angle):
     """Clamp angle to valid range 0-180"""
-    return max(0, min(180, angle))
+    return 0 if angle < 0 else 180 if angle > 180 else angle
+
+# Position currently stored in POSITION_FILE (None = no file yet).
+# Read once, then kept in sync by write_position so unchanged positions skip the disk.
+_disk_position = None
+_disk_loaded = False
 
 def read_position():
     """Read current position from file"""
-    if os.path.exists(POSITION_FILE):
-        with open(POSITION_FILE, 'r') as f:
-            return int(f.read().strip())
-    return 90  # Default if file doesn't exist
+    global _disk_position, _disk_loaded
+    if not _disk_loaded:
+        try:
+            _disk_position = int(POSITION_FILE.read_text().strip())
+        except FileNotFoundError:
+            _disk_position = None
+        _disk_loaded = True
+    return 90 if _disk_position is None else _disk_position  # Default if file doesn't exist
 
 def write_position(angle):
-    """Write current position to file"""
-    with open(POSITION_FILE, 'w') as f:
-        f.write(str(int(angle)))
-
+    """Write current position to file (atomically, so an interrupted run can't leave it empty)"""
+    global _disk_position
+    angle = int(angle)
+    read_position()  # Compare against what's on disk, even if this run never read it
+    if angle == _disk_position:
+        return  # Already on disk - avoid an SD card write
+    _disk_position = angle
+    tmp_file = POSITION_FILE.with_suffix('.tmp')
+    tmp_file.write_text(str(angle))
+    tmp_file.replace(POSITION_FILE)
+
+@functools.lru_cache(maxsize=512)
 def angle_to_duty_cycle(angle):
     """Convert angle (0-180) to duty cycle percentage (2.5-12.5%)"""
     # 0° = 2.5%, 90° = 7.5%, 180° = 12.5%
@@ -1,36 +1,57 @@
-import RPi.GPIO as GPIO
+import lgpio
 import time
 import argparse
-import os
+import functools
+from pathlib import Path
 
-GPIO.setmode(GPIO.BCM)
 SERVO_PIN = 12
-POSITION_FILE = 'motor_position.txt'
+POSITION_FILE = Path('motor_position.txt')
 
-GPIO.setup(SERVO_PIN, GPIO.OUT)
-pwm = GPIO.PWM(SERVO_PIN, 50)
-pwm.start(0)
+# lgpio generates the servo pulses from its own C thread (no RPi.GPIO Python-side PWM jitter)
+h = lgpio.gpiochip_open(0)
+lgpio.gpio_claim_output(h, SERVO_PIN)
 
 def clamp_angle(angle):
     """Clamp angle to valid range 0-180"""
-    return max(0, min(180, angle))
+    return 0 if angle < 0 else 180 if angle > 180 else angle
+
+# Position currently stored in POSITION_FILE (None = no file yet).
+# Read once, then kept in sync by write_position so unchanged positions skip the disk.
+_disk_position = None
+_disk_loaded = False
 
 def read_position():
     """Read current position from file"""
-    if os.path.exists(POSITION_FILE):
-        with open(POSITION_FILE, 'r') as f:
-            return int(f.read().strip())
-    return 90  # Default if file doesn't exist
+    global _disk_position, _disk_loaded
+    if not _disk_loaded:
+        try:
+            _disk_position = int(POSITION_FILE.read_text().strip())
+        except FileNotFoundError:
+            _disk_position = None
+        _disk_loaded = True
+    return 90 if _disk_position is None else _disk_position  # Default if file doesn't exist
 
 def write_position(angle):
-    """Write current position to file"""
-    with open(POSITION_FILE, 'w') as f:
-        f.write(str(int(angle)))
+    """Write current position to file (atomically, so an interrupted run can't leave it empty)"""
+    global _disk_position
+    angle = int(angle)
+    read_position()  # Compare against what's on disk, even if this run never read it
+    if angle == _disk_position:
+        return  # Already on disk - avoid an SD card write
+    _disk_position = angle
+    tmp_file = POSITION_FILE.with_suffix('.tmp')
+    tmp_file.write_text(str(angle))
+    tmp_file.replace(POSITION_FILE)
+
+@functools.lru_cache(maxsize=512)
+def angle_to_pulse_width(angle):
+    """Convert angle (0-180) to servo pulse width in microseconds (500-2500us)"""
+    # Same mapping as the 2.5-12.5% duty cycle at 50Hz
+    return int(500 + (angle / 180.0) * 2000)
 
 def set_angle(angle):
     """Move motor instantly to angle"""
-    duty = 2.5 + (angle / 18)
-    pwm.ChangeDutyCycle(duty)
+    lgpio.tx_servo(h, SERVO_PIN, angle_to_pulse_width(angle))
     time.sleep(0.5)
     write_position(angle)
 
@@ -44,8 +65,7 @@ def move_slow(target_angle, step=1):
         angles = range(start, target_angle - 1, -step)
     
     for angle in angles:
-        duty = 2.5 + (angle / 18)
-        pwm.ChangeDutyCycle(duty)
+        lgpio.tx_servo(h, SERVO_PIN, angle_to_pulse_width(angle))
         time.sleep(0.02)
     
     write_position(target_angle)
@@ -65,5 +85,5 @@ else:
 
 print(f"Moved to {args.angle} degrees using {args.method} method")
 
-pwm.stop()
-GPIO.cleanup()
\ No newline at end of file
+lgpio.tx_servo(h, SERVO_PIN, 0)  # Stop servo pulses
+lgpio.gpiochip_close(h)
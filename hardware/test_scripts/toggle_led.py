@@ -1,23 +1,46 @@
 import lgpio
+import signal
+import argparse
 
 # Setup
 LED_PIN = 17
 led_state = False
 
+parser = argparse.ArgumentParser(description='Toggle the LED with ENTER or a push button')
+parser.add_argument('--button', type=int, default=None,
+                    help='GPIO pin of a push button (to 3.3V) - toggles on press instead of ENTER')
+args = parser.parse_args()
+
 h = lgpio.gpiochip_open(0)
 lgpio.gpio_claim_output(h, LED_PIN)
 
-print("Press ENTER to toggle LED, Ctrl+C to quit")
+def toggle():
+    """Flip the LED and report its new state"""
+    global led_state
+    led_state = not led_state
+    lgpio.gpio_write(h, LED_PIN, 1 if led_state else 0)
+    print(f"LED: {'ON' if led_state else 'OFF'}")
+
+def on_edge(chip, gpio, level, tick):
+    """lgpio alert callback - runs on lgpio's thread for each button press"""
+    toggle()
 
 try:
-    while True:
-        input()
-        led_state = not led_state
-        lgpio.gpio_write(h, LED_PIN, 1 if led_state else 0)
-        print(f"LED: {'ON' if led_state else 'OFF'}")
+    if args.button is not None:
+        # Edge events come from the kernel - no Python thread polls or blocks on input
+        lgpio.gpio_claim_alert(h, args.button, lgpio.RISING_EDGE, lgpio.SET_PULL_DOWN)
+        lgpio.gpio_set_debounce_micros(h, args.button, 20_000)
+        cb = lgpio.callback(h, args.button, lgpio.RISING_EDGE, on_edge)
+        print(f"Press the button on GPIO {args.button} to toggle LED, Ctrl+C to quit")
+        signal.pause()
+    else:
+        print("Press ENTER to toggle LED, Ctrl+C to quit")
+        while True:
+            input()
+            toggle()
 
 except KeyboardInterrupt:
     print("\nExiting...")
 
 finally:
-    lgpio.gpiochip_close(h)
\ No newline at end of file
+    lgpio.gpiochip_close(h)
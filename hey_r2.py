@@ -1,55 +1,69 @@
-# main.py
+# hey_r2.py - voice-only R2-D2 (main.py runs voice and tracking together)
 import time 
 import argparse
 
 from audio.recorder import AudioRecorder, AudioSpeaker
-from audio.wake_word import WakeWordDetector  
+from audio.wake_word import WakeWordDetector, prefer_quantized  
+
+# Resolved once at import, not per main() call
+WAKE_MODEL_PATH = prefer_quantized("audio/wakeword_models/heyr2.onnx")  # INT8 copy if quantized
+WAKE_THRESHOLD = 0.7
+COOLDOWN_SECONDS = 5.0
+STT_MODEL_SIZE = "tiny.en"  # Local Whisper default; --stt-model base for more accuracy
 
 def main():
     parser = argparse.ArgumentParser(description="R2-D2 Voice System")
     parser.add_argument('--local', action='store_true', help="Use local GPU (Ollama) instead of Groq API")
+    parser.add_argument('--stt-model', default=STT_MODEL_SIZE,
+                        help=f"Local Whisper model with --local (default: {STT_MODEL_SIZE}, e.g. base, distil-small.en)")
     args = parser.parse_args() 
 
     # Initialize components
     recorder = AudioRecorder()  
-    # r2_model_path = "audio/wakeword_models/heyr2.tflite"
-    r2_model_path = "audio/wakeword_models/heyr2.onnx"
-    wake_word = WakeWordDetector([r2_model_path], detection_threshold=0.7)
+    wake_word = WakeWordDetector([WAKE_MODEL_PATH], detection_threshold=WAKE_THRESHOLD)
     speaker = AudioSpeaker()
 
     if args.local:
         from processing_unit.speech_to_text import SpeechToText
         from processing_unit.emotion_response_llm import EmotionClassifier
-        stt = SpeechToText(model_size="base")
+        stt = SpeechToText(model_size=args.stt_model)
         emotion_llm = EmotionClassifier()
         print("\nR2-D2 is listening (LOCAL)... Say 'Hey R2' to activate")
     else:
         from processing_unit.speech_to_text import SpeechToText_API
         from processing_unit.emotion_response_llm import EmotionClassifier_API
         stt = SpeechToText_API()
-        emotion_llm = EmotionClassifier_API()
+        emotion_llm = EmotionClassifier_API()  # Shares the STT client - TLS connection reused
         print("\nR2-D2 is listening (API)... Say 'Hey R2' to activate")
     
+    wake_word.warmup()
+    speaker.warmup()
+    stt.warmup()
+    emotion_llm.warmup()
+    
     try:
         recorder.start_listening()
-        last_detection_time = 0
-        cooldown_period = 5.0  # 5 second cooldown
+        cooldown_until = 0.0  # monotonic time until which wake words are ignored
        
         while True:
             # Listen for wake word
-            audio_chunk = recorder.read_chunk()
-            current_time = time.time()
-           
-           # Only check for wake word if cooldown period has passed
-            if (current_time - last_detection_time) > cooldown_period and wake_word.detect(audio_chunk):
+            audio_chunk = recorder.read_chunk_pcm()
+
+            # Skip detection entirely during the cooldown; outside it (cooldown_until == 0.0)
+            # the clock isn't read at all
+            if cooldown_until:
+                if time.monotonic() < cooldown_until:
+                    continue
+                cooldown_until = 0.0
+
+            if wake_word.detect(audio_chunk):
                 print("'Hey R2' Wake word detected! Listening for command...")
-                last_detection_time = current_time
+                cooldown_until = time.monotonic() + COOLDOWN_SECONDS
 
-                # Record 3s of speech
-                command_audio = recorder.record_command(timeout_seconds=2.0)
-                
-                # Transcribe and classify
-                input_text = stt.transcribe(command_audio)
+                # Record 2s of speech, transcribing while it records
+                input_text = stt.transcribe_stream(recorder.record_command_stream(timeout_seconds=2.0))
+
+                # Classify
                 emotion = emotion_llm.classify(input_text) if input_text else None
                 
                 # Clear audio buffer and reset wake word model for next listen
@@ -1,15 +1,72 @@
 #!/usr/bin/env python3
+import os
+import re
 import sys
 import time
 import argparse
+import logging
+import logging.handlers
+import queue
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append('pi_cam')
 sys.path.append('hardware')
 
 from audio.recorder import AudioRecorder, AudioSpeaker
-from audio.wake_word import WakeWordDetector
+from audio.wake_word import WakeWordDetector, prefer_quantized
 from led_handler import LED
+import tracker
+from tracker import DETECT_INTERVAL
+
+# Resolved once at import, not per audio_loop() call
+WAKE_MODEL_PATH = prefer_quantized("audio/wakeword_models/heyr2.onnx")  # INT8 copy if quantized
+WAKE_THRESHOLD = 0.7
+WAKE_BATCH_CHUNKS = 4         # Chunks per wake word model call (~256 ms)
+MUTED_WAKE_BATCH_CHUNKS = 16  # While muted only "unmute" matters - fewer, bigger model calls (~1 s)
+COOLDOWN_SECONDS = 5.0
+STT_MODEL_SIZE = "tiny.en"  # Local Whisper default; --stt-model base for more accuracy
+MAX_QUEUED_COMMANDS = 1  # Commands recorded while another is still being handled
+
+# Per-subsystem loggers - --debug-tracking / --debug-heyr2 turn on their DEBUG output
+tracker_log = logging.getLogger("tracker")
+heyr2_log = logging.getLogger("heyr2")
+
+# Core split on the Pi's 4 cores: Hailo/YOLO + motor on 2-3, audio capture + ONNX wake word on 0-1
+TRACKER_CORES = {2, 3}
+AUDIO_CORES = {0, 1}
+
+# Command phrase -> action. One regex pass over the transcript finds every phrase;
+# when several appear, the action listed first in COMMAND_PRIORITY wins
+COMMAND_PHRASES = {
+    "unmute": "unmute",
+    "mute": "mute",
+    "start tracking": "track_on",
+    "track me": "track_on",
+    "stop tracking": "track_off",
+    "restart now": "restart",
+    "status check": "status",
+}
+COMMAND_PRIORITY = ("unmute", "mute", "track_on", "track_off", "restart", "status")
+# Longest phrase first so "unmute" wins over the "mute" inside it
+COMMAND_RE = re.compile("|".join(re.escape(p) for p in sorted(COMMAND_PHRASES, key=len, reverse=True)))
+
+def match_command(command_lower):
+    """Return the highest-priority action found in the (lowercased) text, or None"""
+    actions = {COMMAND_PHRASES[m.group()] for m in COMMAND_RE.finditer(command_lower)}
+    return min(actions, key=COMMAND_PRIORITY.index) if actions else None
+
+def pin_current_thread(cores: set):
+    """
+    Restrict the calling thread to cores. Threads and processes it starts afterwards inherit
+    the mask; ones that already exist - including the worker pools ONNX Runtime, CTranslate2
+    and torch create when a model is built or first run - keep theirs, so pin before that.
+    No-op on machines with fewer cores or without sched_setaffinity.
+    """
+    if not hasattr(os, "sched_setaffinity") or (os.cpu_count() or 1) <= max(cores):
+        return
+    os.sched_setaffinity(0, cores)  # pid 0 = this thread on Linux
 
 # ============================================================================
 # STATE MANAGEMENT
@@ -22,134 +79,120 @@ class StateManager:
 
         # Tracking subsystem
         self.tracking_enabled = False  # Default OFF
+        self.tracking_event = threading.Event()  # Set while tracking is enabled - the tracker blocks on it
 
         # HeyR2 subsystem
         self.muted = False            # Default not muted
 
         # System
         self.shutdown_event = threading.Event()
+        self._shutdown_callbacks = []  # Wake subsystems blocked on I/O when shutdown is requested
         self.tracker_thread = None
         self.heyr2_thread = None
 
+    # Getters read without the lock: a single attribute load is atomic under the GIL,
+    # and the lock only has to keep concurrent writers consistent
     def is_tracking_enabled(self):
+        return self.tracking_enabled
+
+    def set_tracking_enabled(self, enabled: bool):
         with self._lock:
-            return self.tracking_enabled
+            self.tracking_enabled = enabled
+            if enabled:
+                self.tracking_event.set()
+            else:
+                self.tracking_event.clear()
 
     def is_muted(self):
-        with self._lock:
-            return self.muted
+        return self.muted
 
     def should_shutdown(self):
         return self.shutdown_event.is_set()
 
+    def on_shutdown(self, callback):
+        """Register a callable that unblocks a subsystem (e.g. a blocked audio read) at shutdown"""
+        self._shutdown_callbacks.append(callback)
+
     def request_shutdown(self):
         self.shutdown_event.set()
+        self.tracking_event.set()  # Release the tracker if it's waiting for tracking to be enabled
+        for callback in self._shutdown_callbacks:
+            callback()
 
 # ============================================================================
 # TRACKING SUBSYSTEM
 # ============================================================================
 
-def tracking_loop(state_manager: StateManager, led: LED, args):
-    """Runs the visual tracking system"""
+def init_tracker(args):
+    """Build the camera and motor for the selected mode and warm the detector up"""
+    return tracker.init_tracker(use_cpu=args.cpu, debug=args.debug_tracking,
+                                detect_interval=args.detect_interval,
+                                log=lambda msg: tracker_log.info("[TRACKER] %s", msg))
 
-    # Initialize camera and motor based on mode
-    if args.cpu:
-        from cpu_camera import Camera
-        from motor import Motor
-        camera = Camera(model_name='pi_cam/weights/yolo26n.pt', resolution=(640, 480), fps=30, flip=True, debug=args.debug_tracking)
-        motor = Motor(servo_pin=12, debug=args.debug_tracking)
-        use_threaded = False
-    else:
-        from hailo_camera import HailoCamera
-        from motor_threaded import Motor
-        camera = HailoCamera(model_path='pi_cam/weights/yolov6n_h8l.hef', flip=True, debug=args.debug_tracking)
-        motor = Motor(servo_pin=12, debug=args.debug_tracking)
-        use_threaded = True
+def tracking_loop(state_manager: StateManager, led: LED, camera, motor, use_threaded, args):
+    """Runs the visual tracking system with an already initialized camera and motor"""
+    pin_current_thread(TRACKER_CORES)
 
-    print(f"[TRACKER] Mode: {'CPU' if args.cpu else 'Hailo'}")
-    print(f"[TRACKER] Motor: {'Threaded' if use_threaded else 'Direct PID'}")
+    tracker_log.info("[TRACKER] Mode: %s", 'Hailo' if use_threaded else 'CPU')
+    tracker_log.info("[TRACKER] Motor: %s", 'Threaded' if use_threaded else 'Direct PID')
 
     motor.move_home()
-    if args.debug_tracking:
-        print("[TRACKER] Motor initialized to home - 90 degrees")
+    tracker_log.debug("[TRACKER] Motor initialized to home - 90 degrees")
     time.sleep(2)
 
     if use_threaded:
         motor.start_control_loop()
 
+    # FPS is only counted when something will report it
+    debug = tracker_log.isEnabledFor(logging.DEBUG)
     fps_counter = 0
-    fps_timer = time.time()
-    tracking_active = False
+    fps_timer_ns = time.monotonic_ns()
+    debug_log = (lambda msg: tracker_log.debug("[TRACKER] %s", msg)) if debug else None
+    follower = tracker.TargetFollower(motor, use_threaded, debug_log=debug_log)
 
     try:
         while not state_manager.should_shutdown():
             # Check if tracking is enabled (allows disabling via voice commands later)
-            if not state_manager.is_tracking_enabled():
-                time.sleep(0.1)
-                continue
-
-            offset, confidence = camera.get_person_offset()
-
-            if offset is not None:
-                if not tracking_active:
-                    if args.debug_tracking:
-                        print(f"[TRACKER] Target acquired! Confidence: {confidence:.2f}")
-                    tracking_active = True
-
-                if use_threaded:
-                    motor.set_target_from_offset(offset)
-                else:
-                    moved = motor.move_by_offset_pid(offset)
-                    if not moved and args.debug_tracking:
-                        print("[TRACKER] Centered - minimal movement")
-            else:
-                if use_threaded:
-                    if tracking_active and args.debug_tracking:
-                        print("[TRACKER] Target lost")
-                    tracking_active = False
-                else:
-                    motor.pid.reset()
-                    if tracking_active:
-                        if args.debug_tracking:
-                            print("[TRACKER] Target lost")
-                        motor.stop()
-                        tracking_active = False
+            if not state_manager.tracking_event.wait(timeout=0.5):
+                continue  # Still disabled - loop back to re-check shutdown
+            if state_manager.should_shutdown():
+                break  # Woken by request_shutdown()
+
+            follower.update(*camera.get_person_offset())
 
             if camera.check_quit():
                 state_manager.request_shutdown()
                 break
 
             # FPS monitoring
-            fps_counter += 1
-            if time.time() - fps_timer >= 3.0:
-                fps = fps_counter / 3.0
-                if args.debug_tracking:
+            if debug:
+                fps_counter += 1
+                now_ns = time.monotonic_ns()
+                if now_ns - fps_timer_ns >= 3_000_000_000:
+                    fps = fps_counter / 3.0
                     if use_threaded:
-                        print(f"[TRACKER] Detection FPS: {fps:.1f} | Motor: 100 Hz")
+                        tracker_log.debug("[TRACKER] Detection FPS: %.1f | Motor: 100 Hz", fps)
                     else:
-                        print(f"[TRACKER] Tracking FPS: {fps:.1f}")
-                fps_counter = 0
-                fps_timer = time.time()
+                        tracker_log.debug("[TRACKER] Tracking FPS: %.1f", fps)
+                    fps_counter = 0
+                    fps_timer_ns = now_ns
 
     finally:
         # Cleanup
         if use_threaded:
-            if args.debug_tracking:
-                print("[TRACKER] Stopping motor control loop...")
+            tracker_log.debug("[TRACKER] Stopping motor control loop...")
             motor.stop_control_loop()
             time.sleep(0.5)
         else:
             time.sleep(1)
 
-        if args.debug_tracking:
-            print("[TRACKER] Returning home...")
+        tracker_log.debug("[TRACKER] Returning home...")
         motor.move_home()
-        if args.debug_tracking:
-            print("[TRACKER] Cleaning up...")
+        tracker_log.debug("[TRACKER] Cleaning up...")
         led.set_flashlight(False)
         camera.cleanup()
         motor.cleanup()
-        print("[TRACKER] Stopped")
+        tracker_log.info("[TRACKER] Stopped")
 
 # ============================================================================
 # HEYR2 SUBSYSTEM
@@ -170,60 +213,50 @@ def process_command(command_text, state_manager: StateManager, led: LED, speaker
     - "restart now" (exact) -> stop the program (systemd restarts it)
     - "status check" -> blink LEDs to indicate subsystem health
     """
-    command_lower = command_text.lower()
+    action = match_command(command_text.lower())
 
-    if args.debug_heyr2:
-        print(f"[HEYR2] Processing command: '{command_text}'")
+    heyr2_log.debug("[HEYR2] Processing command: '%s'", command_text)
 
     # Mute: only "unmute" works when muted
     if state_manager.is_muted():
-        if "unmute" in command_lower:
+        if action == "unmute":
             with state_manager._lock:
                 state_manager.muted = False
-            if args.debug_heyr2:
-                print("[HEYR2] Unmuted")
+            heyr2_log.debug("[HEYR2] Unmuted")
             speaker.speak("acknowledge")
             return True
         # Muted - ignore everything else
-        if args.debug_heyr2:
-            print("[HEYR2] Muted - ignoring command")
+        heyr2_log.debug("[HEYR2] Muted - ignoring command")
         return True
 
-    if "mute" in command_lower:
+    if action == "mute":
         with state_manager._lock:
             state_manager.muted = True
-        if args.debug_heyr2:
-            print("[HEYR2] Muted")
+        heyr2_log.debug("[HEYR2] Muted")
         return True  # No response when muting
 
-    if "start tracking" in command_lower or "track me" in command_lower:
-        with state_manager._lock:
-            state_manager.tracking_enabled = True
+    if action == "track_on":
+        state_manager.set_tracking_enabled(True)
         led.set_flashlight(True)
-        if args.debug_heyr2:
-            print("[HEYR2] Tracking enabled")
+        heyr2_log.debug("[HEYR2] Tracking enabled")
         speaker.speak("acknowledge")
         return True
 
-    if "stop tracking" in command_lower:
-        with state_manager._lock:
-            state_manager.tracking_enabled = False
+    if action == "track_off":
+        state_manager.set_tracking_enabled(False)
         led.set_flashlight(False)
-        if args.debug_heyr2:
-            print("[HEYR2] Tracking disabled")
+        heyr2_log.debug("[HEYR2] Tracking disabled")
         speaker.speak("acknowledge")
         return True
 
-    if "restart now" in command_lower:
-        if args.debug_heyr2:
-            print("[HEYR2] Restart requested")
+    if action == "restart":
+        heyr2_log.debug("[HEYR2] Restart requested")
         speaker.speak("acknowledge")
         state_manager.request_shutdown()
         return True
 
-    if "status check" in command_lower:
-        if args.debug_heyr2:
-            print("[HEYR2] Status check requested")
+    if action == "status":
+        heyr2_log.debug("[HEYR2] Status check requested")
         # Blink both LEDs simultaneously for alive subsystems
         blink_threads = []
         if state_manager.heyr2_thread and state_manager.heyr2_thread.is_alive():
@@ -241,79 +274,130 @@ def process_command(command_text, state_manager: StateManager, led: LED, speaker
     # Not a system command - continue to emotion response
     return False
 
-def audio_loop(state_manager: StateManager, led: LED, args):
-    """Runs the audio interaction system"""
+def handle_command(transcription, emotion_llm, state_manager: StateManager, led: LED,
+                   speaker: AudioSpeaker, args):
+    """
+    Respond to a recorded command (runs on the command worker thread). transcription is the
+    future of its STT call, which runs on its own worker - a queued command is transcribed
+    while the one before it is still being classified and played.
+    """
+    led.set_status_light(True)  # Back on for a command that was queued behind another
+    try:
+        # Transcribe (usually already done or in flight by now)
+        input_text = transcription.result()
+
+        if input_text:
+            heyr2_log.info("[HEYR2] Transcription: %s", input_text)
 
-    # Initialize audio components
+            # Process command - returns True if system command handled
+            is_system_command = process_command(input_text, state_manager, led, speaker, args)
+
+            if not is_system_command:
+                # Not a system command - run emotion LLM and respond
+                emotion = emotion_llm.classify(input_text)
+                heyr2_log.info("[HEYR2] Emotion: %s", emotion)
+                speaker.speak(emotion)
+            # else: system command already handled, no emotion response needed
+
+        else:
+            heyr2_log.info("[HEYR2] No speech detected")
+    finally:
+        heyr2_log.info("[HEYR2] Listening for wake word again...\n")
+
+def init_heyr2(args):
+    """Build the audio components, STT and emotion classifier and warm them all up"""
     recorder = AudioRecorder()
-    r2_model_path = "audio/wakeword_models/heyr2.onnx"
-    wake_word = WakeWordDetector([r2_model_path], detection_threshold=0.7)
+    wake_word = WakeWordDetector([WAKE_MODEL_PATH], detection_threshold=WAKE_THRESHOLD,
+                                 batch_chunks=WAKE_BATCH_CHUNKS)
     speaker = AudioSpeaker()
 
     # Initialize STT and emotion classifier
     if args.local:
         from processing_unit.speech_to_text import SpeechToText
         from processing_unit.emotion_response_llm import EmotionClassifier
-        stt = SpeechToText(model_size="base")
+        stt = SpeechToText(model_size=args.stt_model)
         emotion_llm = EmotionClassifier()
-        print("[HEYR2] Mode: LOCAL (Ollama)")
+        heyr2_log.info("[HEYR2] Mode: LOCAL (Ollama)")
     else:
         from processing_unit.speech_to_text import SpeechToText_API
         from processing_unit.emotion_response_llm import EmotionClassifier_API
         stt = SpeechToText_API()
-        emotion_llm = EmotionClassifier_API()
-        print("[HEYR2] Mode: API (Groq)")
+        emotion_llm = EmotionClassifier_API()  # Shares the STT client - TLS connection reused
+        heyr2_log.info("[HEYR2] Mode: API (Groq)")
+
+    # First inference pays model load / kernel selection - do it now, not on the first "Hey R2"
+    wake_word.warmup()
+    speaker.warmup()
+    stt.warmup()
+    emotion_llm.warmup()
+    return recorder, wake_word, speaker, stt, emotion_llm
+
+def audio_loop(state_manager: StateManager, led: LED, recorder, wake_word, speaker, stt, emotion_llm, args):
+    """Runs the audio interaction system with already initialized (and warmed up) components"""
+    pin_current_thread(AUDIO_CORES)
+
+    # STT, LLM and playback run here so this thread keeps draining the microphone. Two stages:
+    # Whisper for the next command overlaps the LLM call and playback of the current one
+    stt_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="HeyR2STT")
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="HeyR2Command")
+    pending = deque()  # Futures of the command being processed and any queued behind it
 
     recorder.start_listening()
-    last_detection_time = 0
-    cooldown_period = 5.0
+    cooldown_until = 0.0  # monotonic time until which wake words are ignored
 
-    print("[HEYR2] Listening for 'Hey R2'...")
+    heyr2_log.info("[HEYR2] Listening for 'Hey R2'...")
 
     try:
         while not state_manager.should_shutdown():
 
             # Listen for wake word
-            audio_chunk = recorder.read_chunk()
-            current_time = time.time()
-
-            if (current_time - last_detection_time) > cooldown_period and wake_word.detect(audio_chunk):
-                print("[HEYR2] 'Hey R2' detected! Listening for command...")
-                led.set_status_light(True)
-                last_detection_time = current_time
-
-                # Record command - always listen, in any state
-                command_audio = recorder.record_command(timeout_seconds=2.0)
-
-                # Transcribe
-                input_text = stt.transcribe(command_audio)
-
-                # Clear buffer
+            audio_chunk = recorder.read_chunk_pcm()
+
+            # Wake word detection keeps running while a command is in flight (network
+            # round-trips in API mode) - the next command is recorded and queued behind it
+            if pending and pending[0].done():
+                while pending and pending[0].done():
+                    try:
+                        pending.popleft().result()
+                    except Exception:
+                        heyr2_log.exception("[HEYR2] Command failed")
+                # Drop R2's own playback and anything said meanwhile from the detector's history
                 recorder.clear_buffer()
                 wake_word.reset()
+                if not pending:
+                    led.set_status_light(False)  # Stays on while a queued command is still to run
+            if len(pending) > MAX_QUEUED_COMMANDS:
+                continue  # Queue full - ignore wake words until the current command finishes
+
+            # Skip detection entirely during the cooldown; outside it (cooldown_until == 0.0)
+            # the clock isn't read at all
+            if cooldown_until:
+                if time.monotonic() < cooldown_until:
+                    continue
+                cooldown_until = 0.0
+
+            # Muted still needs the wake word (for "unmute"), just not a fast reaction to it
+            wake_word.set_batch(MUTED_WAKE_BATCH_CHUNKS if state_manager.is_muted() else WAKE_BATCH_CHUNKS)
+
+            if wake_word.detect(audio_chunk):
+                heyr2_log.info("[HEYR2] 'Hey R2' detected! Listening for command...")
+                led.set_status_light(True)
+                cooldown_until = time.monotonic() + COOLDOWN_SECONDS
 
-                if input_text:
-                    print(f"[HEYR2] Transcription: {input_text}")
-
-                    # Process command - returns True if system command handled
-                    is_system_command = process_command(input_text, state_manager, led, speaker, args)
-
-                    if not is_system_command:
-                        # Not a system command - run emotion LLM and respond
-                        emotion = emotion_llm.classify(input_text)
-                        print(f"[HEYR2] Emotion: {emotion}")
-                        speaker.speak(emotion)
-                    # else: system command already handled, no emotion response needed
-
-                else:
-                    print("[HEYR2] No speech detected")
+                # Record command - always listen, in any state
+                command_audio = recorder.record_command_pcm(timeout_seconds=2.0)
 
-                led.set_status_light(False)
-                print("[HEYR2] Listening for wake word again...\n")
+                # Hand off transcription and response; keep reading chunks meanwhile
+                transcription = stt_executor.submit(stt.transcribe, command_audio)
+                pending.append(executor.submit(handle_command, transcription, emotion_llm,
+                                               state_manager, led, speaker, args))
 
     finally:
+        # Let the running command finish, drop any queued behind it
+        executor.shutdown(wait=True, cancel_futures=True)
+        stt_executor.shutdown(wait=True, cancel_futures=True)
         recorder.stop_listening()
-        print("[HEYR2] Stopped")
+        heyr2_log.info("[HEYR2] Stopped")
 
 # ============================================================================
 # MAIN
@@ -323,11 +407,26 @@ def main():
     # Parse arguments
     parser = argparse.ArgumentParser(description="R2-D2 Complete System")
     parser.add_argument('--cpu', action='store_true', help='Use CPU YOLO instead of Hailo for tracking')
+    parser.add_argument('--detect-interval', type=int, default=DETECT_INTERVAL,
+                        help=f'With --cpu: run YOLO every Nth frame, track in between (default: {DETECT_INTERVAL}, 1 = every frame)')
     parser.add_argument('--local', action='store_true', help='Use local GPU (Ollama) instead of Groq API for audio')
+    parser.add_argument('--stt-model', default=STT_MODEL_SIZE,
+                        help=f'Local Whisper model with --local (default: {STT_MODEL_SIZE}, e.g. base, distil-small.en)')
     parser.add_argument('--debug-tracking', action='store_true', help='Enable debug output for tracking subsystem')
     parser.add_argument('--debug-heyr2', action='store_true', help='Enable debug output for HeyR2 audio subsystem')
     args = parser.parse_args()
 
+    # Everything logs through a queue: the tracking/audio loops only enqueue records and
+    # a background listener thread does the stdout writes
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(message)s"))
+    log_listener = logging.handlers.QueueListener(log_queue, console)
+    logging.basicConfig(handlers=[logging.handlers.QueueHandler(log_queue)])
+    log_listener.start()
+    tracker_log.setLevel(logging.DEBUG if args.debug_tracking else logging.INFO)
+    heyr2_log.setLevel(logging.DEBUG if args.debug_heyr2 else logging.INFO)
+
     # Initialize shared components
     state_manager = StateManager()
     led = LED()
@@ -339,17 +438,25 @@ def main():
     print("Press Ctrl+C to shutdown")
     print("=" * 60)
 
+    # Load and warm every model before either subsystem starts. The main thread is pinned to
+    # each subsystem's cores first, so the library thread pools created here land there too
+    pin_current_thread(TRACKER_CORES)
+    camera, motor, use_threaded = init_tracker(args)
+    pin_current_thread(AUDIO_CORES)
+    recorder, wake_word, speaker, stt, emotion_llm = init_heyr2(args)
+    state_manager.on_shutdown(recorder.wake_from_read)
+
     # Create threads for each subsystem
     tracker_thread = threading.Thread(
         target=tracking_loop,
-        args=(state_manager, led, args),
+        args=(state_manager, led, camera, motor, use_threaded, args),
         name="TrackerThread",
         daemon=True
     )
 
     heyr2_thread = threading.Thread(
         target=audio_loop,
-        args=(state_manager, led, args),
+        args=(state_manager, led, recorder, wake_word, speaker, stt, emotion_llm, args),
         name="HeyR2Thread",
         daemon=True
     )
@@ -364,31 +471,27 @@ def main():
 
     # Main thread waits for shutdown
     try:
-        while not state_manager.should_shutdown():
-            time.sleep(0.5)
+        # Wakes as soon as a subsystem (e.g. "restart now") requests shutdown
+        while not state_manager.shutdown_event.wait(timeout=0.5):
+            pass
     except KeyboardInterrupt:
         print("\n" + "=" * 60)
         print("SHUTDOWN REQUESTED")
         print("=" * 60)
         state_manager.request_shutdown()
 
-    # Blink status light during shutdown (runs indefinitely if something hangs)
-    blink_thread = threading.Thread(
-        target=led.blink_status_light_continuous,
-        args=(2.0,),
-        name="BlinkThread",
-        daemon=True
-    )
-    blink_thread.start()
+    # Blink status light during shutdown (keeps blinking if something hangs)
+    led.blink_status_light_continuous(2.0)
 
-    # Wait for threads to finish cleanup
-    tracker_thread.join(timeout=5.0)
-    heyr2_thread.join(timeout=5.0)
+    # Wait for threads to finish cleanup - one 5s budget shared by both, not 5s each
+    deadline = time.monotonic() + 5.0
+    for thread in (tracker_thread, heyr2_thread):
+        thread.join(timeout=max(0.0, deadline - time.monotonic()))
 
     # Stop blinking, clean up
     led.stop_blink_status_light_continuous()
-    blink_thread.join(timeout=1.0)
     led.cleanup()
+    log_listener.stop()  # Flushes whatever is still queued
 
     print("=" * 60)
     print("R2-D2 SYSTEM STOPPED")
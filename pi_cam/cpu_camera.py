@@ -1,16 +1,55 @@
 #!/usr/bin/env python3
 import cv2
 import os
-from picamera2 import Picamera2
+import numpy as np
+import torch
+from devices import get_picam, release_picam
 from ultralytics import YOLO
+from frame_grabber import FrameGrabber
+from detection import draw_tracking, person_offset
+
+# Exports made by pi_cam/export_yolo.py, most preferred first ({root} = weights path without .pt)
+EXPORTED_MODELS = ("{root}_int8_openvino_model", "{root}_ncnn_model", "{root}.onnx", "{root}_openvino_model")
+
+def prefer_exported(model_path: str) -> str:
+    """Use an exported copy of the .pt weights (NCNN / OpenVINO) when one sits next to them"""
+    root, _ = os.path.splitext(model_path)
+    for template in EXPORTED_MODELS:
+        exported = template.format(root=root)
+        if os.path.exists(exported):
+            return exported
+    return model_path
+
+# torch defaults to one thread per core; leave one for capture and the audio pipeline
+YOLO_THREADS = 3
+
+def create_tracker():
+    """
+    KCF (opencv-contrib) if available, else None - YOLO then runs on every frame. MIL (plain
+    opencv) is not used: it rarely reports a lost target and is slower than just detecting.
+    """
+    create = getattr(cv2, "TrackerKCF_create", None) or getattr(getattr(cv2, "legacy", None), "TrackerKCF_create", None)
+    return create() if create is not None else None
 
 class Camera:
-    def __init__(self, model_name='weights/yolov8n.pt', resolution=(640, 480), fps=30, flip=True, debug=False):
-        """Initialize camera and YOLO model"""
+    def __init__(self, model_name='weights/yolov8n.pt', resolution=(640, 480), fps=30, flip=True, debug=False,
+                 detect_interval=2):
+        """
+        Initialize camera and YOLO model.
+        detect_interval: run YOLO every Nth frame and follow the person with a cheap OpenCV
+                         tracker in between (1 = YOLO on every frame).
+        """
         self.debug = debug
 
-        print("Loading model...")
-        self.model = YOLO(model_name)
+        torch.set_num_threads(YOLO_THREADS)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # Only settable before torch's first parallel op - already fixed for this process
+
+        print(f"Loading model: {model_name}")
+        # task is given explicitly - exported models don't always carry it in their metadata
+        self.model = YOLO(model_name, task='detect')
 
         # Screen center
         self.screen_center_x = resolution[0] // 2
@@ -21,91 +60,155 @@ class Camera:
         self.flip = flip
         
         # Setup camera
-        self.picam2 = Picamera2()
-        config = self.picam2.create_preview_configuration(
-            main={"format": "RGB888", "size": resolution},
-            controls={"FrameRate": fps},
-            buffer_count=1  # Minimize buffering - always get freshest frame
-        )
-        self.picam2.configure(config)
-        self.picam2.start()
+        # The grabber thread drains the buffers continuously, so frames stay fresh
+        self.picam2 = get_picam(resolution, fps, flip=flip, buffer_count=4)
+        # Captures the next frame while YOLO runs on the current one
+        self.grabber = FrameGrabber(self.picam2)
         print(f"Camera started. {'Headless mode' if self.headless else 'Display enabled'}")
         
         self.resolution = resolution
+
+        # Frames are shrunk to the model input width once, into a reused buffer - YOLO's
+        # letterbox then only pads instead of resizing into a fresh array every frame
+        self.imgsz = 320
+        self._infer_size = (self.imgsz, round(resolution[1] * self.imgsz / resolution[0]))
+        self._small = np.empty((self._infer_size[1], self._infer_size[0], 3), dtype=np.uint8)
+        self._box_scale = resolution[0] / self.imgsz  # small-frame box coords -> frame pixels
+
+        # Tracker between detections - runs on the same small frame as YOLO
+        self.detect_interval = detect_interval
+        self._tracker = None
+        self._since_detect = 0
+        self._track_confidence = 0.0  # confidence of the detection the tracker started from
+        
+    def warmup(self):
+        """Run YOLO once on a black frame so the first tracked frame doesn't pay model start-up"""
+        self._small[:] = 0
+        self.model(self._small, imgsz=self.imgsz, verbose=False)
         
     def get_person_offset(self):
         """
         Capture frame and detect person.
         Returns: (offset_x, confidence) or (None, None) if no person detected
         """
-        frame = self.picam2.capture_array()
-        if self.flip:
-            frame = cv2.rotate(frame, cv2.ROTATE_180)
-        
-        # Run YOLO detection
-        results = self.model(frame, imgsz=320, verbose=False)
+        frame = self.grabber.latest()
+        if frame is None:
+            return None, None
         
+        cv2.resize(frame, self._infer_size, dst=self._small, interpolation=cv2.INTER_LINEAR)
+
+        # Between detections, follow the last person with the tracker instead of running YOLO
+        box = None
+        if self._tracker is not None and self._since_detect < self.detect_interval - 1:
+            self._since_detect += 1
+            ok, (bx, by, bw, bh) = self._tracker.update(self._small)
+            if ok:
+                box = (bx, by, bx + bw, by + bh)
+                confidence = self._track_confidence
+            else:
+                self._tracker = None  # Lost - detect again right away
+
+        if box is None:
+            box, confidence = self._detect()
+
         offset_x = None
-        confidence = None
-        
-        # Get person detections (class 0 in YOLO)
-        for r in results:
-            boxes = r.boxes
-            if boxes is not None:
-                for box in boxes:
-                    if int(box.cls) == 0 and float(box.conf) > 0.6:  # Person class
-                        # Get first person only
-                        x1, y1, x2, y2 = box.xyxy[0].int().tolist()
-                        confidence = float(box.conf)
-                        
-                        # Calculate person center
-                        cx = (x1 + x2) // 2
-                        cy = (y1 + y2) // 2
-                        
-                        # Calculate horizontal offset from screen center
-                        offset_x = cx - self.screen_center_x
-                        if self.flip: 
-                            offset_x = -offset_x
-                        
-                        if not self.headless:
-                            self._draw_visualization(frame, x1, y1, x2, y2, cx, cy, offset_x, confidence)
-
-                        direction = "RIGHT" if offset_x > 0 else "LEFT"
-
-                        if self.debug:
-                            print(f"Person at X={cx} | Offset: {offset_x:+4d}px ({direction:5s}) | Conf: {confidence:.2f}")
-
-                        break  # Only track first person
-                break  # Only process first result
-        
+        if box is None:
+            confidence = None
+        else:
+            x1, y1, x2, y2 = (int(v * self._box_scale) for v in box)
+
+            # Person center and horizontal offset from screen center
+            cx, offset_x = person_offset(x1, x2, self.screen_center_x, self.flip)
+
+            if not self.headless:
+                draw_tracking(frame, x1, y1, x2, y2, cx, offset_x, confidence, self.screen_center_x)
+
+            if self.debug:
+                direction = "RIGHT" if offset_x > 0 else "LEFT"
+                print(f"Person at X={cx} | Offset: {offset_x:+4d}px ({direction:5s}) | Conf: {confidence:.2f}")
+
         # Show frame if display available
         if not self.headless:
             cv2.imshow('Person Detection', frame)
             
         return offset_x, confidence
     
-    def _draw_visualization(self, frame, x1, y1, x2, y2, cx, cy, offset_x, confidence):
-        """Draw bounding box and tracking visualization"""
-        # Draw box and person center
-        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-        cv2.circle(frame, (cx, cy), 5, (0, 0, 255), -1)
-        
-        # Draw screen center line (vertical)
-        cv2.line(frame, (self.screen_center_x, 0), 
-                (self.screen_center_x, self.resolution[1]), (255, 0, 0), 1)
-        
-        # Draw horizontal offset line
-        cv2.line(frame, (self.screen_center_x, cy), (cx, cy), (255, 255, 0), 2)
-        
-        # Display offset info
-        direction = "RIGHT" if offset_x > 0 else "LEFT"
-        cv2.putText(frame, f"{direction} {abs(offset_x)}px", 
-                   (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
-                   0.7, (255, 255, 255), 2)
-        cv2.putText(frame, f"Conf: {confidence:.2f}", 
-                   (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 
-                   0.7, (255, 255, 255), 2)
-    
+    def _detect(self):
+        """
+        Run YOLO on the small frame. Returns the most confident person's box in small-frame
+        coordinates and its confidence, or (None, None). (Re)starts the tracker on it.
+        """
+        box, confidence = self._pick_person(self.model(self._small, imgsz=self.imgsz, verbose=False)[0])
+        if box is None:
+            self._tracker = None
+            return None, None
+        x1, y1, x2, y2 = box
+
+        if self.detect_interval > 1:
+            self._tracker = create_tracker()
+            if self._tracker is not None:
+                self._tracker.init(self._small, (int(x1), int(y1), int(x2 - x1), int(y2 - y1)))
+                self._since_detect = 0
+                self._track_confidence = confidence
+        return (x1, y1, x2, y2), confidence
+
+    def _pick_person(self, result):
+        """Most confident person box (small-frame coordinates) and its confidence from one YOLO result"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return None, None
+
+        # Person class (0) above the confidence threshold - filtered in one go, not box by box
+        cls = boxes.cls.cpu().numpy()
+        conf = boxes.conf.cpu().numpy()
+        people = np.flatnonzero((cls == 0) & (conf > 0.6))
+        if len(people) == 0:
+            return None, None
+
+        best = people[conf[people].argmax()]
+        return tuple(boxes.xyxy[best].cpu().numpy().tolist()), float(conf[best])
+
+    def get_person_offsets(self, batch_size=4):
+        """
+        Grab the next batch_size frames and detect in all of them with one YOLO call.
+        Returns a list of (offset_x, confidence) in frame order, (None, None) where nobody was found.
+        """
+        frames = []
+        for _ in range(batch_size):
+            frame = self.grabber.latest()
+            if frame is None:
+                break
+            frames.append(frame)
+        return self.infer_batch(frames)
+
+    def infer_batch(self, frames):
+        """Batched YOLO on several frames - [(offset_x, confidence), ...] in the same order"""
+        if not frames:
+            return []
+        small = [cv2.resize(frame, self._infer_size, interpolation=cv2.INTER_LINEAR) for frame in frames]
+        results = self.model(small, imgsz=self.imgsz, verbose=False)
+        self._tracker = None  # Every frame gets a detection - the in-between tracker isn't used
+
+        offsets = []
+        for frame, result in zip(frames, results):
+            box, confidence = self._pick_person(result)
+            if box is None:
+                offsets.append((None, None))
+                continue
+            x1, y1, x2, y2 = (int(v * self._box_scale) for v in box)
+            cx, offset_x = person_offset(x1, x2, self.screen_center_x, self.flip)
+            if not self.headless:
+                draw_tracking(frame, x1, y1, x2, y2, cx, offset_x, confidence, self.screen_center_x)
+            if self.debug:
+                direction = "RIGHT" if offset_x > 0 else "LEFT"
+                print(f"Person at X={cx} | Offset: {offset_x:+4d}px ({direction:5s}) | Conf: {confidence:.2f}")
+            offsets.append((offset_x, confidence))
+
+        # Show the newest frame if display available
+        if not self.headless:
+            cv2.imshow('Person Detection', frames[-1])
+        return offsets
+
     def check_quit(self):
         """Check if 'q' key pressed (only works with display)"""
         if not self.headless:
@@ -114,7 +217,8 @@ class Camera:
     
     def cleanup(self):
         """Clean up camera and display"""
-        self.picam2.stop()
+        self.grabber.stop()
+        release_picam()
         if not self.headless:
             cv2.destroyAllWindows()
         if self.debug:
@@ -0,0 +1,41 @@
+# pi_cam/detection.py
+"""Offset math and the tracking overlay shared by Camera and HailoCamera"""
+import cv2
+
+def person_offset(x1, x2, center_x, flip):
+    """
+    Box centre x and its signed offset from the screen centre in pixels.
+    The offset is negated for a flipped (upside-down) camera so the motor turns the right way.
+    """
+    cx = (x1 + x2) // 2
+    offset_x = cx - center_x
+    return cx, (-offset_x if flip else offset_x)
+
+# Overlay styling, looked up once at import rather than per frame
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+BOX_COLOR = (0, 255, 0)
+CENTER_COLOR = (0, 0, 255)
+CENTER_LINE_COLOR = (255, 0, 0)
+OFFSET_LINE_COLOR = (255, 255, 0)
+TEXT_COLOR = (255, 255, 255)
+FPS_COLOR = (0, 255, 0)
+DIRECTION = {True: "RIGHT", False: "LEFT"}
+
+def draw_tracking(frame, x1, y1, x2, y2, cx, offset_x, confidence, center_x, fps=None):
+    """Draw the person box, its centre, the screen centre line and the offset readout"""
+    cy = (y1 + y2) // 2
+    # Draw box and person center
+    cv2.rectangle(frame, (x1, y1), (x2, y2), BOX_COLOR, 2)
+    cv2.circle(frame, (cx, cy), 5, CENTER_COLOR, -1)
+
+    # Draw screen center line (vertical)
+    cv2.line(frame, (center_x, 0), (center_x, frame.shape[0]), CENTER_LINE_COLOR, 1)
+
+    # Draw horizontal offset line
+    cv2.line(frame, (center_x, cy), (cx, cy), OFFSET_LINE_COLOR, 2)
+
+    # Display offset info
+    cv2.putText(frame, f"{DIRECTION[offset_x > 0]} {abs(offset_x)}px", (10, 30), FONT, 0.7, TEXT_COLOR, 2)
+    cv2.putText(frame, f"Conf: {confidence:.2f}", (10, 60), FONT, 0.7, TEXT_COLOR, 2)
+    if fps is not None:
+        cv2.putText(frame, f"FPS: {fps:.1f}", (10, 90), FONT, 0.7, FPS_COLOR, 2)
@@ -0,0 +1,56 @@
+# pi_cam/detection_worker.py
+import threading
+import time
+
+class DetectionWorker:
+    """
+    Runs camera.get_person_offset() on its own thread and keeps only the newest result, so the
+    caller never waits on capture or inference. Works with Camera and HailoCamera; frames the
+    detector is too busy for are already dropped by the camera (FrameGrabber / NPU pipeline).
+    The display (imshow / 'q' key) is handled on this thread too - OpenCV's window calls have
+    to stay on one thread.
+    """
+    def __init__(self, camera):
+        self.camera = camera
+
+        self._result = (None, None)
+        self._timestamp_ns = 0
+        self._seq = 0  # results produced so far
+        self._cond = threading.Condition()
+        self.quit_requested = False  # 'q' pressed in the display window
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="DetectionWorker", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            offset, confidence = self.camera.get_person_offset()
+            quit_pressed = self.camera.check_quit()
+            with self._cond:
+                self._result = (offset, confidence)
+                self._timestamp_ns = time.monotonic_ns()
+                self._seq += 1
+                if quit_pressed:
+                    self.quit_requested = True
+                    self._running = False
+                self._cond.notify_all()
+
+    def latest(self, seen_seq: int = 0, timeout: float = 1.0):
+        """
+        Newest (offset, confidence, timestamp_ns, seq) once there is a result newer than seen_seq,
+        waiting for one if needed. None on timeout or after stop() / 'q'.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq != seen_seq or not self._running, timeout):
+                return None
+            if self._seq == seen_seq:
+                return None
+            return self._result + (self._timestamp_ns, self._seq)
+
+    def stop(self):
+        """Stop detecting (call before camera.cleanup())"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=2.0)
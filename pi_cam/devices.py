@@ -0,0 +1,85 @@
+# pi_cam/devices.py
+import atexit
+import threading
+from libcamera import Transform
+from picamera2 import Picamera2
+
+# One Picamera2 and one Hailo device per model, shared by every camera object in the process.
+# Opening the CSI camera or loading a .hef is slow, so a camera object that is torn down and
+# rebuilt (or a second one) gets the already-open device. Everything is closed at exit.
+_lock = threading.Lock()
+_picam = None
+_picam_config = None  # (resolution, fps, flip, buffer_count) the camera is running with
+_picam_refs = 0
+_hailo_cache = {}
+_hailo_refs = {}
+
+def get_picam(resolution, fps, flip=True, buffer_count=4) -> Picamera2:
+    """Return the shared, started Picamera2 - reconfigured only if the settings changed"""
+    global _picam, _picam_config, _picam_refs
+    config_key = (tuple(resolution), fps, flip, buffer_count)
+    with _lock:
+        if _picam is None:
+            _picam = Picamera2()
+        if _picam_config != config_key:
+            if _picam_config is not None:
+                _picam.stop()
+            config = _picam.create_preview_configuration(
+                main={"format": "RGB888", "size": tuple(resolution)},
+                controls={"FrameRate": fps},
+                buffer_count=buffer_count,
+                # 180° rotation done by the sensor/ISP - frames arrive upright, no per-frame copy
+                transform=Transform(hflip=flip, vflip=flip)
+            )
+            _picam.configure(config)
+            _picam_config = config_key
+            _picam.start()
+        elif _picam_refs == 0:
+            _picam.start()  # Same settings, stopped by the last release
+        _picam_refs += 1
+        return _picam
+
+def release_picam():
+    """Drop one reference to the shared camera - the last release stops streaming (it stays open)"""
+    global _picam_refs
+    with _lock:
+        if _picam is None or _picam_refs == 0:
+            return
+        _picam_refs -= 1
+        if _picam_refs == 0:
+            _picam.stop()
+
+def get_hailo(model_path: str):
+    """Return the shared Hailo device with this .hef loaded"""
+    from picamera2.devices import Hailo
+    with _lock:
+        hailo = _hailo_cache.get(model_path)
+        if hailo is None:
+            hailo = Hailo(model_path)
+            _hailo_cache[model_path] = hailo
+            _hailo_refs[model_path] = 0
+        _hailo_refs[model_path] += 1
+        return hailo
+
+def release_hailo(model_path: str):
+    """Drop one reference to a shared Hailo device (closed at exit)"""
+    with _lock:
+        if _hailo_refs.get(model_path, 0) > 0:
+            _hailo_refs[model_path] -= 1
+
+@atexit.register
+def close_all():
+    """Stop and close every shared device"""
+    global _picam, _picam_config, _picam_refs
+    with _lock:
+        for hailo in _hailo_cache.values():
+            hailo.close()
+        _hailo_cache.clear()
+        _hailo_refs.clear()
+        if _picam is not None:
+            if _picam_refs > 0:
+                _picam.stop()
+            _picam.close()
+            _picam = None
+            _picam_config = None
+            _picam_refs = 0
@@ -0,0 +1,83 @@
+# pi_cam/export_yolo.py
+"""
+Export the CPU-mode YOLO weights to a runtime that's faster on the Pi's ARM cores
+(yolo26n.pt -> yolo26n_ncnn_model/, yolo26n.onnx with --format onnx, yolo26n_openvino_model/
+with --format openvino, or yolo26n_int8_openvino_model/ with --int8).
+Camera users pick the export up automatically through prefer_exported().
+
+The export is fixed to one input size - keep --imgsz at the imgsz Camera runs with (320).
+For --int8, calibrate on frames from the Pi camera itself - either a YOLO dataset yaml
+(--data) or --capture N, which grabs N frames from the camera into pi_cam/calibration/
+first - and check detections before relying on it. Delete the exported directory to go
+back to the .pt weights.
+"""
+import argparse
+import os
+import time
+
+from ultralytics import YOLO
+
+CALIBRATION_DIR = "pi_cam/calibration"
+
+def capture_calibration(num_frames, names, out_dir=CALIBRATION_DIR, interval=0.2):
+    """
+    Save num_frames camera frames (as Camera sees them) and a dataset yaml pointing at them.
+    Unlabelled is fine - INT8 calibration only needs the images. Returns the yaml path.
+    """
+    import cv2
+    from devices import get_picam, release_picam
+
+    image_dir = os.path.join(out_dir, "images")
+    os.makedirs(image_dir, exist_ok=True)
+    picam2 = get_picam((640, 480), 30, flip=True)
+    try:
+        for i in range(num_frames):
+            frame = picam2.capture_array("main")
+            cv2.imwrite(os.path.join(image_dir, f"{i:04d}.jpg"), frame)
+            time.sleep(interval)  # Spread the captures out - move around while it runs
+    finally:
+        release_picam()
+
+    yaml_path = os.path.join(out_dir, "calibration.yaml")
+    with open(yaml_path, "w") as f:
+        f.write(f"path: {os.path.abspath(out_dir)}\ntrain: images\nval: images\nnames:\n")
+        for class_id, name in names.items():
+            f.write(f"  {class_id}: {name}\n")
+    print(f"Captured {num_frames} calibration frames into {image_dir}")
+    return yaml_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Export YOLO weights for CPU tracking")
+    parser.add_argument('model', nargs='?', default="pi_cam/weights/yolo26n.pt",
+                        help='PyTorch weights (default: pi_cam/weights/yolo26n.pt)')
+    parser.add_argument('--imgsz', type=int, default=320, help='Input size Camera runs at (default: 320)')
+    parser.add_argument('--format', choices=('ncnn', 'onnx', 'openvino'), default='ncnn',
+                        help='Runtime to export for (default: ncnn)')
+    parser.add_argument('--int8', action='store_true',
+                        help='INT8 OpenVINO export (needs --data for calibration)')
+    parser.add_argument('--data', default=None, help='Dataset yaml with calibration images for --int8')
+    parser.add_argument('--capture', type=int, default=0,
+                        help='With --int8: capture this many calibration frames from the camera instead of --data')
+    args = parser.parse_args()
+
+    if args.int8 and args.data is None and args.capture <= 0:
+        parser.error("--int8 needs --data or --capture N: calibration images from the Pi camera")
+    if args.int8 and args.format not in ('ncnn', 'openvino'):
+        parser.error("--int8 is an OpenVINO export - leave --format out or set it to openvino")
+
+    model = YOLO(args.model)
+    if args.int8 and args.data is None:
+        args.data = capture_calibration(args.capture, model.names)
+    if args.int8:
+        # ultralytics' NCNN export has no INT8 mode; OpenVINO's post-training quantization runs on ARM too
+        output_path = model.export(format='openvino', int8=True, data=args.data, imgsz=args.imgsz)
+    elif args.format == 'onnx':
+        # Static 320 input, graph simplified for ONNX Runtime's CPU kernels. FP16 (half) export
+        # needs a CUDA device in ultralytics, and the Pi's CPU has no faster FP16 path anyway
+        output_path = model.export(format='onnx', opset=17, simplify=True, imgsz=args.imgsz)
+    else:
+        output_path = model.export(format=args.format, imgsz=args.imgsz)
+    print(f"Wrote {output_path}")
+
+if __name__ == "__main__":
+    main()
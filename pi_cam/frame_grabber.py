@@ -0,0 +1,46 @@
+# pi_cam/frame_grabber.py
+import threading
+
+class FrameGrabber:
+    """
+    Captures frames from a started Picamera2 on its own thread and keeps only the newest,
+    so capture runs while the caller is busy with inference on the previous frame.
+    """
+    def __init__(self, picam2, stream: str = "main"):
+        self.picam2 = picam2
+        self.stream = stream
+
+        self._frame = None
+        self._captured = 0  # frames captured so far
+        self._handed_out = 0  # value of _captured when latest() last returned
+        self._cond = threading.Condition()
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            frame = self.picam2.capture_array(self.stream)
+            with self._cond:
+                self._frame = frame  # older unread frames are simply dropped
+                self._captured += 1
+                self._cond.notify()
+
+    def latest(self, timeout: float = 1.0):
+        """Newest frame not handed out yet, waiting for one if needed. None on timeout or stop()."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._captured != self._handed_out or not self._running,
+                                       timeout):
+                return None
+            if not self._running:
+                return None
+            self._handed_out = self._captured
+            return self._frame
+
+    def stop(self):
+        """Stop capturing (call before stopping the camera)"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
@@ -7,8 +7,19 @@ Tracks person position and calculates horizontal offset from screen center.
 import os
 import time
 import cv2
-from picamera2 import Picamera2
-from picamera2.devices import Hailo
+import numpy as np
+from devices import get_hailo, get_picam, release_hailo, release_picam
+from detection import draw_tracking, person_offset
+
+# numba is optional - without it select_person runs as plain Python
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 # COCO class names (person is class 0)
 COCO_CLASSES = [
@@ -26,6 +37,21 @@ COCO_CLASSES = [
     "toothbrush"
 ]
 
+@njit(cache=True)
+def select_person(people, threshold):
+    """
+    Index of the highest-scoring person detection at or above threshold, or -1.
+    people: (N, 5) float32 rows of [y0, x0, y1, x1, score] (Hailo NMS output for one class)
+    """
+    best = -1
+    best_score = threshold
+    for i in range(people.shape[0]):
+        score = people[i, 4]
+        if score >= best_score:
+            best = i
+            best_score = score
+    return best
+
 class HailoCamera:
     def __init__(self, model_path="/usr/share/hailo-models/weights/yolov6n_h8l.hef",
                  flip=True, threshold=0.6, debug=False):
@@ -38,7 +64,8 @@ class HailoCamera:
         self.headless = os.environ.get('DISPLAY') is None
 
         print(f"Loading Hailo model: {model_path}")
-        self.hailo = Hailo(model_path)
+        self.model_path = model_path
+        self.hailo = get_hailo(model_path)
         self.model_h, self.model_w, _ = self.hailo.get_input_shape()
         self.class_names = COCO_CLASSES
 
@@ -47,115 +74,119 @@ class HailoCamera:
         self.screen_center_y = self.resolution[1] // 2
 
         print("Starting camera...")
-        self.picam2 = Picamera2()
-        config = self.picam2.create_preview_configuration(
-            main={"format": "RGB888", "size": (self.model_w, self.model_h)},
-            controls={'FrameRate': 60},
-            buffer_count=2
-        )
-        self.picam2.configure(config)
-        self.picam2.start()
+        # Four buffers: one frame on the NPU, one being decoded, two for the ISP to fill
+        self.picam2 = get_picam((self.model_w, self.model_h), 60, flip=flip, buffer_count=4)
 
         print(f"Camera started. {'Headless mode' if self.headless else 'Display enabled'}")
         print(f"Model input size: {self.model_w}x{self.model_h}")
 
         self.fps = 0.0
         self.frame_count = 0
-        self.fps_start_time = time.time()
-        self.last_fps_print = time.time()
+        self.fps_start_ns = time.monotonic_ns()
+
+        # (future, frame) already queued on the NPU - see get_person_offset
+        self._in_flight = None
 
-    def _extract_detections(self, hailo_output, w, h):
+    def _extract_detections(self, hailo_output, w, h, class_ids=None):
+        """
+        All detections at or above the threshold as dicts, highest score first within a class.
+        class_ids limits decoding to those classes (e.g. (0,) for people only).
+        """
         results = []
-        for class_id, detections in enumerate(hailo_output):
-            for detection in detections:
-                score = detection[4]
-                if score >= self.threshold:
-                    y0, x0, y1, x1 = detection[:4]
-                    bbox = (int(x0 * w), int(y0 * h), int(x1 * w), int(y1 * h))
-                    results.append({
-                        'class_id': class_id,
-                        'class_name': self.class_names[class_id],
-                        'bbox': bbox,
-                        'score': score
-                    })
+        scale = np.array([w, h, w, h], dtype=np.float32)
+        for class_id in (range(len(hailo_output)) if class_ids is None else class_ids):
+            detections = hailo_output[class_id]
+            if len(detections) == 0:
+                continue
+            detections = np.asarray(detections, dtype=np.float32)
+            kept = detections[detections[:, 4] >= self.threshold]
+            if len(kept) == 0:
+                continue
+            kept = kept[np.argsort(-kept[:, 4])]
+            # [y0, x0, y1, x1] -> pixel [x0, y0, x1, y1] for every kept box at once
+            bboxes = (kept[:, [1, 0, 3, 2]] * scale).astype(np.int32)
+            for bbox, score in zip(bboxes.tolist(), kept[:, 4].tolist()):
+                results.append({
+                    'class_id': class_id,
+                    'class_name': self.class_names[class_id],
+                    'bbox': tuple(bbox),
+                    'score': score
+                })
         return results
 
-    def get_person_offset(self):
-        self.frame_count += 1
-        elapsed = time.time() - self.fps_start_time
-        if elapsed >= 1.0:
-            self.fps = self.frame_count / elapsed
-            self.frame_count = 0
-            self.fps_start_time = time.time()
+    def warmup(self):
+        """Run one inference on a black frame so the first tracked frame doesn't pay device start-up"""
+        self.hailo.run(np.zeros((self.model_h, self.model_w, 3), dtype=np.uint8))
+        select_person(np.zeros((1, 5), dtype=np.float32), self.threshold)  # compile / load the cached kernel
 
+    def _submit(self):
+        """Capture a frame and queue it on the NPU without waiting for the result"""
         frame = self.picam2.capture_array("main")
+        return self.hailo.run_async(frame), frame
 
-        if self.flip:
-            frame = cv2.rotate(frame, cv2.ROTATE_180)
-
-        results = self.hailo.run(frame)
-        detections = self._extract_detections(results, self.resolution[0], self.resolution[1])
+    def get_person_offset(self):
+        # FPS is only shown in the debug line and on the display
+        if self.debug or not self.headless:
+            self.frame_count += 1
+            now_ns = time.monotonic_ns()
+            elapsed_ns = now_ns - self.fps_start_ns
+            if elapsed_ns >= 1_000_000_000:
+                self.fps = self.frame_count * 1e9 / elapsed_ns
+                self.frame_count = 0
+                self.fps_start_ns = now_ns
+
+        # Two-deep pipeline: the next frame is captured and queued on the NPU before this
+        # one's result is collected, so capture and inference overlap with decoding/drawing.
+        # The offset returned is one frame old.
+        if self._in_flight is None:
+            self._in_flight = self._submit()
+        future, frame = self._in_flight
+        self._in_flight = self._submit()
+        results = future.result()
 
         offset_x = None
         confidence = None
 
-        for det in detections:
-            if det['class_id'] == 0:
-                x1, y1, x2, y2 = det['bbox']
-                confidence = det['score']
+        # Person is class 0 - pick its best box straight from the raw NMS array
+        people = np.asarray(results[0], dtype=np.float32)
+        best = select_person(people, self.threshold) if len(people) else -1
 
-                cx = (x1 + x2) // 2
-                cy = (y1 + y2) // 2
+        if best >= 0:
+            ny0, nx0, ny1, nx1, score = people[best]  # normalized coordinates
+            w, h = self.resolution
+            x1, y1, x2, y2 = int(nx0 * w), int(ny0 * h), int(nx1 * w), int(ny1 * h)
+            confidence = float(score)
 
-                offset_x = cx - self.screen_center_x
-                if self.flip:
-                    offset_x = -offset_x
+            cx, offset_x = person_offset(x1, x2, self.screen_center_x, self.flip)
 
-                if not self.headless:
-                    self._draw_visualization(frame, x1, y1, x2, y2, cx, cy, offset_x, confidence)
+            if not self.headless:
+                draw_tracking(frame, x1, y1, x2, y2, cx, offset_x, confidence, self.screen_center_x, fps=self.fps)
 
+            if self.debug:
                 direction = "RIGHT" if offset_x > 0 else "LEFT"
-
-                if self.debug:
-                    print(
-                        f"FPS: {self.fps:5.1f} | "
-                        f"Person at X={cx} | "
-                        f"Offset: {offset_x:+4d}px ({direction:5s}) | "
-                        f"Conf: {confidence:.2f}"
-                    )
-
-                break
+                print(
+                    f"FPS: {self.fps:5.1f} | "
+                    f"Person at X={cx} | "
+                    f"Offset: {offset_x:+4d}px ({direction:5s}) | "
+                    f"Conf: {confidence:.2f}"
+                )
 
         if not self.headless:
             cv2.imshow('Hailo Person Detection', frame)
 
         return offset_x, confidence
 
-    def _draw_visualization(self, frame, x1, y1, x2, y2, cx, cy, offset_x, confidence):
-        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-        cv2.circle(frame, (cx, cy), 5, (0, 0, 255), -1)
-
-        cv2.line(frame, (self.screen_center_x, 0),
-                 (self.screen_center_x, self.resolution[1]), (255, 0, 0), 1)
-
-        cv2.line(frame, (self.screen_center_x, cy), (cx, cy), (255, 255, 0), 2)
-
-        direction = "RIGHT" if offset_x > 0 else "LEFT"
-        cv2.putText(frame, f"{direction} {abs(offset_x)}px",
-                    (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(frame, f"Conf: {confidence:.2f}",
-                    (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(frame, f"FPS: {self.fps:.1f}",
-                    (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-
     def check_quit(self):
         if not self.headless:
             return cv2.waitKey(1) & 0xFF == ord('q')
         return False
 
     def cleanup(self):
-        self.picam2.stop()
-        self.hailo.close()
+        if self._in_flight is not None:
+            self._in_flight[0].result()  # Let the queued inference finish before releasing the device
+            self._in_flight = None
+        release_picam()
+        release_hailo(self.model_path)
         if not self.headless:
             cv2.destroyAllWindows()
         if self.debug:
@@ -1,8 +1,27 @@
 # processing_unit/emotion_classifier.py
 import argparse
-import io
+import json
 import ollama
 
+VALID_CATEGORIES = ('happy', 'curious', 'concerned', 'scared', 'acknowledge')
+# Enough tokens for the longest category word, not for an explanation after it
+MAX_RESPONSE_TOKENS = 4
+OLLAMA_KEEP_ALIVE = '30m'  # Keep the weights loaded between commands
+# JSON mode answer is {"category": "<word>"} - with headroom, since Groq rejects a reply
+# cut off mid-object (400 json_validate_failed) instead of returning it
+MAX_JSON_RESPONSE_TOKENS = 32
+
+def match_category(result: str):
+    """Map the model's answer (possibly cut off by the token limit) to a category, or None"""
+    word = result.strip().lower().strip('.!"\'')
+    if word in VALID_CATEGORIES:
+        return word
+    if len(word) >= 3:  # "cur" vs "con" - shorter prefixes are ambiguous
+        for category in VALID_CATEGORIES:
+            if category.startswith(word) or word.startswith(category):
+                return category
+    return None
+
 class EmotionClassifier:
     """Local emotion classifier using Ollama"""
     def __init__(self, model_name: str = "mistral:7b"):
@@ -24,60 +43,72 @@ class EmotionClassifier:
             "Danger!" → scared
             "Status" → acknowledge
             """
-        self.valid_categories = ['happy', 'curious', 'concerned', 'scared', 'acknowledge']
+        self.valid_categories = frozenset(VALID_CATEGORIES)
+        self._context = None  # System prompt already processed by the model - set by warmup()
+
+    def warmup(self):
+        """
+        Load the model and run the system prompt through it once. The returned context is
+        sent with every command, so Ollama only has to process the command itself.
+        """
+        response = ollama.generate(
+            model=self.model_name,
+            prompt=self.system_prompt,
+            # 1, not 0 - a non-positive limit isn't documented as "prompt only" and may mean no limit
+            options={'num_predict': 1},
+            keep_alive=OLLAMA_KEEP_ALIVE
+        )
+        self._context = response.get('context')
 
     def classify(self, text: str) -> str:
-        full_prompt = f"{self.system_prompt}\n\nCommand: \"{text}\"\nCategory:"
+        if self._context:
+            prompt = f"Command: \"{text}\"\nCategory:"
+        else:
+            prompt = f"{self.system_prompt}\n\nCommand: \"{text}\"\nCategory:"  # Not warmed up
         response = ollama.generate(
             model=self.model_name,
-            prompt=full_prompt,
-            options={'temperature': 0.1}
+            prompt=prompt,
+            context=self._context,
+            options={'temperature': 0.1, 'num_predict': MAX_RESPONSE_TOKENS, 'stop': ['\n']},
+            keep_alive=OLLAMA_KEEP_ALIVE
         )
         result = response['response'].strip().lower()
         print(result)
-        
-        if result not in self.valid_categories:
+
+        category = match_category(result)
+        if category is None:
             print("defaulting to acknowledge")
             return 'acknowledge'
-        return result
+        return category
 
 
 class EmotionClassifier_API:
     """Cloud emotion classifier using Groq API"""
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, client=None):
         """
         Initialize Groq client.
         If api_key is None, uses GROQ_API_KEY environment variable.
+        Instances share one process-wide client (HTTP/2 keep-alive) unless one is passed in.
         """
-        from groq import Groq
-        from dotenv import load_dotenv
-        load_dotenv()  # Loads .env into environment variables
-        print("Loaded env variables")
-        
-        self.client = Groq(api_key=api_key)
-        self.system_prompt = """Classify the following command into exactly ONE category:
-            - happy
-            - curious
-            - concerned
-            - scared
-            - acknowledge
-            Rules:
-            - Output only the category word (happy, curious, concerned, scared, acknowledge).
-            - No explanation or extra text.
-            - If unsure, pick the closest category.
-            Examples:
-            "Hello" → happy
-            "What's that?" → curious
-            "Help me" → concerned
-            "Danger!" → scared
-            "Status" → acknowledge
-            """
-        self.valid_categories = ['happy', 'curious', 'concerned', 'scared', 'acknowledge']
+        from processing_unit.groq_client import get_client
+        self.client = client if client is not None else get_client(api_key)
+        # Short prompt - it is re-sent (and billed) with every command
+        self.system_prompt = (
+            "Classify the robot command into one category: " + "|".join(VALID_CATEGORIES) + ". "
+            'Examples: "Hello"=happy, "What\'s that?"=curious, "Help me"=concerned, '
+            '"Danger!"=scared, "Status"=acknowledge. '
+            'Pick the closest if unsure. Respond with JSON {"category": "<category>"}.'
+        )
+        self.valid_categories = frozenset(VALID_CATEGORIES)
+
+    def warmup(self):
+        """Nothing to load locally - the model runs on Groq's side"""
+        pass
 
     def transcribe(self, audio_bytes: bytes) -> str:
         """Convert audio bytes to text using Groq Whisper"""
-        audio_file = io.BytesIO(audio_bytes)
-        audio_file.name = "audio.wav"
+        # (filename, content, mime type) - uploaded as-is, no file wrapper around the bytes
+        audio_file = ("audio.wav", audio_bytes, "audio/wav")
         
         transcription = self.client.audio.transcriptions.create(
             model="whisper-large-v3",
@@ -87,21 +118,33 @@ class EmotionClassifier_API:
 
     def classify(self, text: str) -> str:
         """Classify text into emotion category using Groq LLM"""
-        response = self.client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": text}
-            ],
-            temperature=0.1
-        )
-        result = response.choices[0].message.content.strip().lower()
+        from groq import APIError
+        try:
+            response = self.client.chat.completions.create(
+                model="llama-3.1-8b-instant",
+                messages=[
+                    {"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": text}
+                ],
+                temperature=0,
+                max_tokens=MAX_JSON_RESPONSE_TOKENS,
+                response_format={"type": "json_object"}  # Groq validates the output is JSON
+            )
+        except APIError as e:
+            print(f"Groq error ({e}) - defaulting to acknowledge")
+            return 'acknowledge'
+        content = response.choices[0].message.content
+        try:
+            result = str(json.loads(content).get('category', '')).lower()
+        except (ValueError, AttributeError):
+            result = content.strip().lower()  # Not a JSON object - try it as a bare word
         print(result)
-        
-        if result not in self.valid_categories:
+
+        category = match_category(result)
+        if category is None:
             print("defaulting to acknowledge")
             return 'acknowledge'
-        return result
+        return category
 
     def process_audio(self, audio_bytes: bytes) -> tuple[str, str]:
         """
@@ -115,6 +158,11 @@ class EmotionClassifier_API:
 
 
 def main():
+    import sys
+    import os
+    # Add project root to path for imports
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
     parser = argparse.ArgumentParser(description="R2-D2 Emotion Classifier Test")
     parser.add_argument('--local', action='store_true', help="Use local GPU (Ollama) instead of Groq API")
     args = parser.parse_args()
@@ -0,0 +1,32 @@
+# processing_unit/groq_client.py
+import threading
+
+# HTTP/2 needs the h2 package (httpx[http2]); without it the client stays on keep-alive HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+_clients = {}
+_lock = threading.Lock()
+
+def get_client(api_key: str = None):
+    """
+    One Groq client per API key for the whole process, so speech-to-text and the emotion
+    classifier share its connection pool and only the first request pays the TLS handshake.
+    If api_key is None, uses GROQ_API_KEY environment variable.
+    """
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            import httpx
+            from groq import Groq
+            from dotenv import load_dotenv
+            load_dotenv()  # Loads .env into environment variables
+
+            http_client = httpx.Client(http2=HTTP2, timeout=30.0,
+                                       limits=httpx.Limits(max_keepalive_connections=4))
+            client = Groq(api_key=api_key, http_client=http_client)
+            _clients[api_key] = client
+        return client
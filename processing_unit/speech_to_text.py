@@ -1,55 +1,177 @@
 # processing_unit/speech_to_text.py
-import whisper
+from faster_whisper import WhisperModel
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+import ctranslate2
+import numpy as np
 import io
 import wave
-import tempfile
-import os
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Leave the other cores to the camera / YOLO thread
+STT_CPU_THREADS = 2
+# English-only tiny model - short commands don't need "base"; "distil-small.en" is the accurate option
+STT_MODEL_SIZE = "tiny.en"
+STT_LANGUAGE = "en"  # Commands are English - skips the language detection pass
+# INT8 weights everywhere; a GPU computes the activations in FP16, the Pi's CPU stays in INT8
+COMPUTE_TYPES = {"cuda": "int8_float16", "cpu": "int8"}
+# Silero VAD settings for short commands (faster-whisper's defaults are tuned for long recordings)
+VAD_PARAMETERS = {"min_silence_duration_ms": 300, "speech_pad_ms": 200}
+# Greedy single-pass decoding for short commands: no beam search, no temperature-fallback
+# re-decodes, no timestamp tokens, no conditioning on the previous 30 s window
+DECODE_OPTIONS = {
+    "beam_size": 1,
+    "best_of": 1,
+    "temperature": 0.0,
+    "condition_on_previous_text": False,
+    "without_timestamps": True,
+    "language": STT_LANGUAGE,
+}
+# transcribe_stream: decode what's been recorded once this much is pending and it ends in a pause
+STREAM_WINDOW_SECONDS = 1.0
+PAUSE_SECONDS = 0.1
+PAUSE_RMS = 500  # int16 RMS below this counts as a pause between words
+WARMUP_SECONDS = 2.0  # Same length as a recorded command
+
+def wav_to_audio(audio_data):
+    """
+    Decode a recorded command in memory for faster-whisper - no temp file.
+    Raw int16 PCM (AudioRecorder.record_command_pcm) and 16 kHz 16-bit WAV bytes become float32
+    samples directly; any other WAV is handed over as a file object for faster-whisper to
+    decode and resample.
+    """
+    if isinstance(audio_data, np.ndarray):
+        return audio_data.astype(np.float32) * (1 / 32768.0)
+    with wave.open(io.BytesIO(audio_data)) as wav:
+        if wav.getframerate() != 16000 or wav.getsampwidth() != 2:
+            return io.BytesIO(audio_data)
+        channels = wav.getnchannels()
+        pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1)
+    return pcm.astype(np.float32) * (1 / 32768.0)
+
+def trim_silence(audio_data):
+    """
+    Cut a recorded command down to its speech with Silero VAD, as int16 PCM - empty if nothing
+    was said. WAVs that aren't 16 kHz 16-bit come back untouched.
+    """
+    audio = wav_to_audio(audio_data)
+    if not isinstance(audio, np.ndarray):
+        return audio_data
+    speech = get_speech_timestamps(audio, VadOptions(**VAD_PARAMETERS))
+    if not speech:
+        return np.zeros(0, dtype=np.int16)
+    trimmed = np.concatenate([audio[chunk["start"]:chunk["end"]] for chunk in speech])
+    return (trimmed * 32767).astype(np.int16)
 
 class SpeechToText:
-    def __init__(self, model_size: str = "base"):
-        """Initialize Whisper model
+    def __init__(self, model_size: str = STT_MODEL_SIZE, cpu_threads: int = STT_CPU_THREADS, device: str = "auto",
+                 warmup: bool = True):
+        """Initialize Whisper model (faster-whisper / CTranslate2, INT8 weights, FP16 compute on GPU)
         Args:
-            model_size: tiny, base, small, medium, large
+            model_size: tiny.en, base.en, distil-small.en, ... or tiny, base, small, medium, large
+            cpu_threads: CTranslate2 threads, kept low so transcription doesn't starve tracking
+            device: "auto" (CUDA when available, else CPU), "cpu" or "cuda"
+            warmup: decode a command-length clip right away so the first command runs at full speed
         """
-        print(f"\nLoading Whisper {model_size} model...")
-        self.model = whisper.load_model(model_size)
-        
-    def transcribe(self, audio_data: bytes) -> str:
-        """Convert audio bytes to text"""
-        # Write audio data to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-            temp_file.write(audio_data)
-            temp_path = temp_file.name
-        
-        try:
-            # Transcribe using Whisper
-            result = self.model.transcribe(temp_path)
-            text = result["text"].strip()
-            # print(f"Transcribed: '{text}'")
-            return text
-        finally:
-            # Clean up temp file
-            os.unlink(temp_path)
+        if device == "auto":
+            device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        print(f"\nLoading Whisper {model_size} model ({device}, {COMPUTE_TYPES[device]})...")
+        self.model = WhisperModel(model_size, device=device, compute_type=COMPUTE_TYPES[device],
+                                  cpu_threads=cpu_threads, num_workers=1)
+        self._warmed_up = False
+        if warmup:
+            self.warmup()
+
+    def warmup(self):
+        """
+        Decode a command-length clip once so the first real command doesn't pay set-up.
+        CTranslate2 ships precompiled kernels - there's no graph compile step (torch.compile)
+        to trigger, only allocations and caches to fill. Low noise rather than zeros, so the
+        decoder runs a few steps instead of stopping at the first token.
+        """
+        if self._warmed_up:
+            return
+        self._warmed_up = True
+        noise = np.random.default_rng(0).normal(0.0, 0.01, int(16000 * WARMUP_SECONDS)).astype(np.float32)
+        segments, _ = self.model.transcribe(noise, **DECODE_OPTIONS)
+        for _ in segments:  # segments is lazy - decoding happens while iterating
+            pass
+
+    def transcribe(self, audio_data) -> str:
+        """Convert audio (WAV bytes or 16 kHz int16 PCM samples) to text"""
+        # Segments come out lazily - VAD skips the silence around the command
+        segments, _ = self.model.transcribe(wav_to_audio(audio_data), vad_filter=True,
+                                            vad_parameters=VAD_PARAMETERS, **DECODE_OPTIONS)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        # print(f"Transcribed: '{text}'")
+        return text
+
+    def transcribe_stream(self, audio_chunks) -> str:
+        """
+        Transcribe a command while it is still being recorded. audio_chunks yields 16 kHz int16
+        pieces (AudioRecorder.record_command_stream); each second or so of audio is decoded as soon
+        as it ends in a pause, with the text so far as the prompt, so only the last piece is left
+        to decode when the recording ends.
+        """
+        window = int(16000 * STREAM_WINDOW_SECONDS)
+        pause = int(16000 * PAUSE_SECONDS)
+        pending = []
+        pending_samples = 0
+        texts = []
+        for chunk in audio_chunks:
+            pending.append(chunk)
+            pending_samples += len(chunk)
+            if pending_samples < window:
+                continue
+            audio = np.concatenate(pending)
+            tail = audio[-pause:].astype(np.float32)
+            if np.sqrt(np.mean(tail * tail)) >= PAUSE_RMS:
+                continue  # Mid-word - cutting here would split it between two decodes
+            texts.append(self._transcribe_piece(audio, " ".join(texts)))
+            pending = []
+            pending_samples = 0
+        if pending:
+            texts.append(self._transcribe_piece(np.concatenate(pending), " ".join(texts)))
+        return " ".join(text for text in texts if text)
+
+    def _transcribe_piece(self, pcm, previous_text: str) -> str:
+        """Decode one piece of a streamed command, conditioned on the text before it"""
+        segments, _ = self.model.transcribe(wav_to_audio(pcm), vad_filter=True, vad_parameters=VAD_PARAMETERS,
+                                            initial_prompt=previous_text or None, **DECODE_OPTIONS)
+        return " ".join(segment.text.strip() for segment in segments).strip()
 
 
 class SpeechToText_API:
     """Cloud speech-to-text using Groq Whisper API"""
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, client=None):
         """
         Initialize Groq client.
         If api_key is None, uses GROQ_API_KEY environment variable.
+        Instances share one process-wide client (HTTP/2 keep-alive) unless one is passed in.
         """
-        from groq import Groq
-        from dotenv import load_dotenv
-        load_dotenv()
+        from processing_unit.groq_client import get_client
+        self.client = client if client is not None else get_client(api_key)
 
-        self.client = Groq(api_key=api_key)
-
-    def transcribe(self, audio_data: bytes) -> str:
-        """Convert audio bytes to text using Groq Whisper"""
-        audio_file = io.BytesIO(audio_data)
-        audio_file.name = "audio.wav"
+    def warmup(self):
+        """Open the connection to Groq now so the first command doesn't pay the TLS handshake"""
+        try:
+            self.client.models.list()
+        except Exception as e:
+            print(f"Groq warmup failed: {e}")
+
+    def transcribe(self, audio_data) -> str:
+        """Convert audio (WAV bytes or 16 kHz int16 PCM samples) to text using Groq Whisper"""
+        # Only the speech is uploaded - and nothing at all when the command was silence
+        audio_data = trim_silence(audio_data)
+        if isinstance(audio_data, np.ndarray) and len(audio_data) == 0:
+            return ""
+        if isinstance(audio_data, np.ndarray):
+            from audio.recorder import pcm_to_wav
+            audio_data = pcm_to_wav(audio_data)  # The upload needs a file format
+        # (filename, content, mime type) - uploaded as-is, no file wrapper around the bytes
+        audio_file = ("audio.wav", audio_data, "audio/wav")
 
         transcription = self.client.audio.transcriptions.create(
             model="whisper-large-v3",
@@ -57,6 +179,11 @@ class SpeechToText_API:
         )
         return transcription.text.strip()
 
+    def transcribe_stream(self, audio_chunks) -> str:
+        """Same interface as SpeechToText.transcribe_stream - the upload needs the whole recording"""
+        chunks = list(audio_chunks)
+        return self.transcribe(np.concatenate(chunks)) if chunks else ""
+
 
 def main():
     import sys
@@ -66,13 +193,16 @@ def main():
 
     parser = argparse.ArgumentParser(description="R2-D2 Speech-to-Text Test")
     parser.add_argument('--local', action='store_true', help="Use local Whisper instead of Groq API")
+    parser.add_argument('--model', default=STT_MODEL_SIZE,
+                        help=f"Local Whisper model (default: {STT_MODEL_SIZE}, e.g. base, distil-small.en)")
+    parser.add_argument('--count', type=int, default=1, help="Commands to record back to back (default: 1)")
     args = parser.parse_args()
 
     from audio.recorder import AudioRecorder
 
     if args.local:
         print("R2-D2 Speech-to-Text Test (Local Whisper)")
-        stt = SpeechToText(model_size="base")
+        stt = SpeechToText(model_size=args.model)
     else:
         print("R2-D2 Speech-to-Text Test (Groq API)")
         print("Using GROQ_API_KEY environment variable")
@@ -80,17 +210,26 @@ def main():
 
     recorder = AudioRecorder()
 
+    # Each recording is transcribed on a worker while the next one is already being recorded
+    executor = ThreadPoolExecutor(max_workers=1)
+    in_flight = None
     try:
         recorder.start_listening()
-        print("\nRecording for 3 seconds...")
-        audio_data = recorder.record_command(timeout_seconds=2.0)
-
-        print("Transcribing...")
-        text = stt.transcribe(audio_data)
-        print(f"Transcription: {text}")
+        for i in range(args.count):
+            print(f"\nRecording {i + 1}/{args.count} for 2 seconds...")
+            audio_data = recorder.record_command_pcm(timeout_seconds=2.0)
+            if in_flight is not None:
+                print(f"Transcription: {in_flight.result()}")
+                in_flight = None
+            in_flight = executor.submit(stt.transcribe, audio_data)
+        if in_flight is not None:
+            print("Transcribing...")
+            print(f"Transcription: {in_flight.result()}")
+    except KeyboardInterrupt:
+        print("\nInterrupted by user")
     finally:
+        executor.shutdown(wait=True, cancel_futures=True)
         recorder.stop_listening()
 
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,30 +1,114 @@
 #!/usr/bin/env python3
+import os
 import sys
 import time
 import argparse
+import logging
 sys.path.append('pi_cam')
 sys.path.append('hardware')
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--cpu', action='store_true', help='Use CPU YOLO instead of Hailo')
-    parser.add_argument('--debug', action='store_true', help='Enable debug output')
-    args = parser.parse_args()
+HAILO_MODEL_PATH = 'pi_cam/weights/yolov6n_h8l.hef'
+CPU_MODEL_PATH = 'pi_cam/weights/yolo26n.pt'
+DETECT_INTERVAL = 2  # CPU mode: YOLO every Nth frame, OpenCV tracker in between
 
-    if args.cpu:
-        from cpu_camera import Camera
+def init_tracker(use_cpu=False, debug=False, detect_interval=DETECT_INTERVAL, log=print):
+    """
+    Build the camera and motor for the selected mode and warm the detector up - shared by
+    this script and main.py. Hailo (threaded motor) is the default; without its .hef the
+    CPU YOLO path (direct PID motor) is used instead.
+    Returns: (camera, motor, use_threaded)
+    """
+    use_hailo = not use_cpu and os.path.exists(HAILO_MODEL_PATH)
+    if not use_cpu and not use_hailo:
+        log(f"{HAILO_MODEL_PATH} not found - falling back to CPU YOLO")
+
+    if not use_hailo:
+        from cpu_camera import Camera, prefer_exported
         from motor import Motor
-        camera = Camera(model_name='pi_cam/weights/yolo26n.pt', resolution=(640, 480), fps=30, flip=True, debug=args.debug)
-        motor = Motor(servo_pin=12, debug=args.debug)
+        camera = Camera(model_name=prefer_exported(CPU_MODEL_PATH), resolution=(640, 480), fps=30, flip=True,
+                        debug=debug, detect_interval=detect_interval)
+        motor = Motor(servo_pin=12, debug=debug)
         use_threaded = False
     else:
         from hailo_camera import HailoCamera
         from motor_threaded import Motor
-        camera = HailoCamera(model_path='pi_cam/weights/yolov6n_h8l.hef', flip=True, debug=args.debug)
-        motor = Motor(servo_pin=12, debug=args.debug)
+        camera = HailoCamera(model_path=HAILO_MODEL_PATH, flip=True, debug=debug)
+        motor = Motor(servo_pin=12, debug=debug)
         use_threaded = True
 
-    print(f"Mode: {'CPU' if args.cpu else 'Hailo'}")
+    camera.warmup()
+    return camera, motor, use_threaded
+
+class TargetFollower:
+    """Turns per-frame detections into motor moves and tracks whether a target is held"""
+    def __init__(self, motor, use_threaded, debug_log=None):
+        """debug_log: callable for acquired/lost/centered messages, or None for silence"""
+        self.motor = motor
+        self.use_threaded = use_threaded
+        self.debug_log = debug_log
+        self.tracking_active = False
+        self.centered = False  # Last PID update didn't move - "Centered" is logged once per entry
+
+    def update(self, offset, confidence):
+        """Apply one frame's (offset, confidence) - (None, None) when nobody was detected"""
+        motor = self.motor
+        debug_log = self.debug_log
+        if offset is not None:
+            if not self.tracking_active:
+                if debug_log:
+                    debug_log(f"Target acquired! Confidence: {confidence:.2f}")
+                self.tracking_active = True
+
+            if self.use_threaded:
+                motor.set_target_from_offset(offset)
+            else:
+                moved = motor.move_by_offset_pid(offset)
+                if moved:
+                    self.centered = False
+                elif not self.centered:  # Only on entering the dead zone, not every frame in it
+                    self.centered = True
+                    if debug_log:
+                        debug_log("Centered - minimal movement")
+        else:
+            if self.use_threaded:
+                if self.tracking_active and debug_log:
+                    debug_log("Target lost")
+                self.tracking_active = False
+            else:
+                motor.pid.reset()
+                self.centered = False
+                if self.tracking_active:
+                    if debug_log:
+                        debug_log("Target lost")
+                    motor.stop()
+                    self.tracking_active = False
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cpu', action='store_true', help='Use CPU YOLO instead of Hailo')
+    parser.add_argument('--debug', action='store_true', help='Enable debug output')
+    parser.add_argument('--max-fps', type=float, default=60.0, help='Cap the tracking loop rate (default: 60)')
+    parser.add_argument('--detect-interval', type=int, default=DETECT_INTERVAL,
+                        help=f'CPU mode: run YOLO every Nth frame, track in between (default: {DETECT_INTERVAL}, 1 = every frame)')
+    parser.add_argument('--batch', type=int, default=1,
+                        help='CPU mode: frames per YOLO call (default: 1) - more throughput, older offsets')
+    parser.add_argument('--async-detect', action='store_true',
+                        help='Detect on a background thread; the loop only applies the newest result')
+    args = parser.parse_args()
+
+    # Hardware modules log through `logging`; print their messages like the rest of the output
+    logging.basicConfig(format="%(message)s")
+    log = logging.getLogger("tracker")
+    if args.debug:
+        log.setLevel(logging.DEBUG)
+
+    camera, motor, use_threaded = init_tracker(use_cpu=args.cpu, debug=args.debug,
+                                               detect_interval=args.detect_interval)
+
+    # Hailo streams frames through the NPU itself - batching only applies to synchronous CPU YOLO
+    batch_size = args.batch if not use_threaded and not args.async_detect else 1
+
+    print(f"Mode: {'Hailo' if use_threaded else 'CPU'}")
     print(f"Motor: {'Threaded' if use_threaded else 'Direct PID'}")
 
     motor.move_home()
@@ -36,8 +120,23 @@ def main():
         motor.start_control_loop()
 
     fps_counter = 0
-    fps_timer = time.time()
-    tracking_active = False
+    fps_timer_ns = time.monotonic_ns()
+    follower = TargetFollower(motor, use_threaded, debug_log=log.debug if args.debug else None)
+
+    # Fixed cadence - sleep off the slack instead of spinning, frees the core for the motor thread
+    period_ns = int(batch_size * 1_000_000_000 / args.max_fps)
+    next_tick_ns = time.monotonic_ns()
+
+    # Background detection: the loop picks up each new result instead of waiting on the camera
+    detector = None
+    if args.async_detect:
+        from detection_worker import DetectionWorker
+        detector = DetectionWorker(camera)
+    last_seq = 0
+    last_timestamp_ns = 0
+    # Measured time between detector results (EMA) - a result older than this is stale, a newer
+    # one is already on its way
+    detect_period_ns = 0
 
     print("Tracking started. Press Ctrl+C to exit")
     if not camera.headless:
@@ -45,38 +144,51 @@ def main():
 
     try:
         while True:
-            offset, confidence = camera.get_person_offset()
-
-            if offset is not None:
-                if not tracking_active:
-                    if args.debug:
-                        print(f"Target acquired! Confidence: {confidence:.2f}")
-                    tracking_active = True
-
-                if use_threaded:
-                    motor.set_target_from_offset(offset)
+            if detector is not None:
+                result = detector.latest(last_seq)
+                if result is None:
+                    if detector.quit_requested:
+                        break
+                    detections = ()  # Detector stalled - nothing new this tick
                 else:
-                    moved = motor.move_by_offset_pid(offset)
-                    if not moved and args.debug:
-                        print("Centered - minimal movement")
+                    offset, confidence, timestamp_ns, seq = result
+                    if last_timestamp_ns:
+                        # Per result, even if the loop skipped some
+                        interval_ns = (timestamp_ns - last_timestamp_ns) // (seq - last_seq)
+                        if detect_period_ns:
+                            detect_period_ns = (7 * detect_period_ns + interval_ns) // 8
+                        else:
+                            detect_period_ns = interval_ns
+                    last_seq, last_timestamp_ns = seq, timestamp_ns
+                    age_ns = time.monotonic_ns() - timestamp_ns
+                    # A stale position isn't chased, but "nobody there" is always passed on
+                    if offset is not None and detect_period_ns and age_ns > detect_period_ns:
+                        detections = ()
+                    else:
+                        detections = ((offset, confidence),)
+            elif batch_size > 1:
+                detections = camera.get_person_offsets(batch_size)
             else:
-                if use_threaded:
-                    if tracking_active and args.debug:
-                        print("Target lost")
-                    tracking_active = False
-                else:
-                    motor.pid.reset()
-                    if tracking_active:
-                        if args.debug:
-                            print("Target lost")
-                        motor.stop()
-                        tracking_active = False
-
-            if camera.check_quit():
+                detections = (camera.get_person_offset(),)
+
+            # Batched frames are applied in capture order, one motor update each
+            for offset, confidence in detections:
+                follower.update(offset, confidence)
+
+            if detector is None and camera.check_quit():
                 break
 
-            fps_counter += 1
-            if time.time() - fps_timer >= 3.0:
+            # One clock read per iteration - cadence and FPS both work off now_ns
+            next_tick_ns += period_ns
+            now_ns = time.monotonic_ns()
+            if next_tick_ns > now_ns:
+                time.sleep((next_tick_ns - now_ns) / 1e9)
+                now_ns = next_tick_ns
+            else:
+                next_tick_ns = now_ns  # Running behind - don't try to catch up
+
+            fps_counter += len(detections)
+            if now_ns - fps_timer_ns >= 3_000_000_000:
                 fps = fps_counter / 3.0
                 if args.debug:
                     if use_threaded:
@@ -84,13 +196,15 @@ def main():
                     else:
                         print(f"[Tracking FPS: {fps:.1f}]")
                 fps_counter = 0
-                fps_timer = time.time()
+                fps_timer_ns = now_ns
 
     except KeyboardInterrupt:
         print("\nShutdown requested...")
     except Exception as e:
         print(f"Error: {e}")
     finally:
+        if detector is not None:
+            detector.stop()
         if use_threaded:
             if args.debug:
                 print("Stopping motor control loop...")